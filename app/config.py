@@ -19,6 +19,62 @@ OVERLAP_SIZE = 200
 TEMPERATURE = 0.7
 MAX_TOKENS = 500
 
+# PDF Extraction Configuration
+# Worker processes for page extraction; documents shorter than
+# PARALLEL_MIN_PAGES are extracted in-process to avoid pool start-up cost.
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', os.cpu_count() or 1))
+PARALLEL_MIN_PAGES = 64
+# "auto" prefers pypdfium2 when installed; pages that fail or come back
+# empty are retried with PyPDF2.
+PDF_BACKEND = os.getenv('PDF_BACKEND', 'auto')
+
+# Table Extraction Configuration
+EXTRACT_TABLES = os.getenv('EXTRACT_TABLES', 'true').lower() == 'true'
+TABLE_CHUNK_ROWS = 10
+MIN_TABLE_ROWS = 3
+TABLE_K = 2
+
+# Embedding Configuration
+# "azure" calls the embedding deployment; "onnx" runs the model directory at
+# LOCAL_EMBEDDING_MODEL (model.onnx + tokenizer.json) on the CPU. Providers
+# produce different vectors, so re-index after switching.
+EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'azure')
+LOCAL_EMBEDDING_MODEL = os.getenv('LOCAL_EMBEDDING_MODEL', 'models/embedder')
+# ONNX Runtime threads for local embedding, leaving cores for the web server
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', max(1, (os.cpu_count() or 2) // 2)))
+EMBEDDING_MAX_BATCH = 64
+# How long the first request of a batch waits for company; 0 still batches
+# whatever queued up while the previous batch was running
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv('EMBEDDING_BATCH_WAIT_MS', 2))
+EMBEDDING_MAX_LENGTH = 256
+
+# Hierarchical Retrieval Configuration
+# When enabled, sentence-level child chunks are embedded and searched, and
+# hits are expanded to their PARENT_CHUNK_SIZE parent sections (held in a
+# docstore, not embedded) up to PARENT_TOKEN_BUDGET tokens of context.
+HIERARCHICAL_RETRIEVAL = os.getenv('HIERARCHICAL_RETRIEVAL', 'false').lower() == 'true'
+PARENT_CHUNK_SIZE = 1500
+CHILD_MIN_CHARS = 120
+CHILD_MAX_CHARS = 400
+PARENT_TOKEN_BUDGET = 1200
+# Children searched per requested parent, so k distinct parents can be found
+CHILD_CANDIDATES = 3
+
+# Deduplication Configuration
+# Near-duplicate chunks (MinHash Jaccard >= DEDUP_THRESHOLD with identical
+# figures) are stored once, with every source recorded in their metadata.
+DEDUP_CHUNKS = os.getenv('DEDUP_CHUNKS', 'true').lower() == 'true'
+DEDUP_THRESHOLD = 0.9
+MINHASH_PERMUTATIONS = 128
+# 16 bands of 8 rows make pairs above ~0.7 similarity candidates
+LSH_BANDS = 16
+SHINGLE_SIZE = 5
+
+# Conversation Configuration
+MAX_HISTORY_MESSAGES = 20
+HISTORY_TOKEN_BUDGET = 1000
+REWRITE_MAX_TOKENS = 64
+
 # Logging Configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -26,6 +82,11 @@ LOG_FILE = "logs/app.log"
 
 # Vector Store Configuration
 VECTOR_STORE_PATH = "vector_store"
+# "none" keeps the Chroma collection; "float16" or "int8" switches to the
+# quantized NumPy store, which rescores RESCORE_FACTOR * k candidates at
+# full precision.
+EMBEDDING_QUANTIZATION = os.getenv('EMBEDDING_QUANTIZATION', 'none')
+RESCORE_FACTOR = 4
 
 def validate_config():
     """Validate that all required configuration variables are set."""
@@ -12,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import validate_config, AZURE_OPENAI_DEPLOYMENT_NAME
 from app.logging import setup_logging
+from src.conversation import ConversationHistory
 from src.pdf_processor import PDFProcessor
 from src.rag_engine import RAGEngine
 
@@ -62,7 +63,7 @@ if 'rag_engine' not in st.session_state:
 if 'pdf_processor' not in st.session_state:
     st.session_state.pdf_processor = PDFProcessor()
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = ConversationHistory()
 if 'uploaded_pdfs' not in st.session_state:
     st.session_state.uploaded_pdfs = set()
 
@@ -95,12 +96,15 @@ def process_pdf(pdf_file):
             # Add chunks to vector store
             texts = [chunk[0] for chunk in chunks]
             metadata = [{"source": pdf_file.name, **chunk[1]} for chunk in chunks]
-            st.session_state.rag_engine.add_documents(texts, metadata)
+            report = st.session_state.rag_engine.add_documents(texts, metadata)
             
             # Mark PDF as processed
             st.session_state.uploaded_pdfs.add(pdf_file.name)
             
         st.success(f"Successfully processed '{pdf_file.name}'!")
+        if report["duplicates"]:
+            st.caption(f"{report['duplicates']} of {report['chunks']} chunks duplicated text already "
+                       f"indexed and were stored once (~{report['embedding_tokens_saved']:,} embedding tokens saved)")
         logger.info(f"PDF '{pdf_file.name}' processed and added to vector store")
         
     except Exception as e:
@@ -163,44 +167,32 @@ def main():
     
     # Main chat interface
     if st.session_state.rag_engine:
-        # Display chat history
-        for message in st.session_state.chat_history:
-            display_chat_message(
-                role=message["role"],
-                content=message["content"]
-            )
+        history = st.session_state.chat_history
         
-        # Chat input
-        user_question = st.text_input(
-            "Ask a question about commercial real estate:",
-            placeholder="e.g., What is LTV? How is DSCR calculated?",
-            key="user_question"
+        # chat_input only returns a value on submit, so reruns don't re-query
+        user_question = st.chat_input(
+            "Ask a question about commercial real estate, e.g. What is LTV? How is DSCR calculated?"
         )
         
         if user_question:
             try:
-                # Add user message to chat
-                st.session_state.chat_history.append({
-                    "role": "user",
-                    "content": user_question
-                })
-                
                 with st.spinner("Generating answer..."):
-                    response = st.session_state.rag_engine.query(user_question)
-                
-                # Add assistant response to chat
-                st.session_state.chat_history.append({
-                    "role": "assistant",
-                    "content": response["answer"]
-                })
+                    response = st.session_state.rag_engine.query(user_question, history=history)
                 
-                # Display latest messages immediately
-                display_chat_message("user", user_question)
-                display_chat_message("assistant", response["answer"])
+                # History is capped, so rendering below stays bounded
+                history.append("user", user_question)
+                history.append("assistant", response["answer"])
                 
             except Exception as e:
                 logger.error(f"Error generating answer: {str(e)}")
                 st.error(f"Error generating answer: {str(e)}")
+        
+        # Display chat history
+        for message in history:
+            display_chat_message(
+                role=message["role"],
+                content=message["content"]
+            )
     
     else:
         st.info("👆 Please upload PDF documents in the sidebar to start asking questions!")
@@ -0,0 +1,102 @@
+"""
+Compare the local ONNX embedding provider with the remote Azure provider.
+
+Measures sequential single-question latency (the per-query cost),
+throughput of concurrent single-question requests (where micro-batching
+pays off) and bulk ingest throughput. The remote side is the fake Azure
+server with --remote-latency-ms of network + service time unless
+--remote azure is given, which uses the configured deployment.
+
+Usage:
+    python -m benchmarks.bench_embeddings --model models/embedder --concurrency 16
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.corpus import CRE_SENTENCES
+from benchmarks.fake_azure_openai import FakeAzureOpenAIProcess, FakeServerConfig
+
+TINY_MODEL = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "tiny_embedder")
+
+
+def measure(provider, queries: int, concurrency: int, bulk: int) -> Dict[str, float]:
+    """Time sequential, concurrent and bulk embedding against one provider."""
+    questions = [f"What does clause {i} say? {CRE_SENTENCES[i % len(CRE_SENTENCES)]}" for i in range(queries)]
+    provider.embed(questions[:1])  # Warm up sessions and connections
+
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        provider.embed([question])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda q: provider.embed([q]), questions))
+    concurrent_seconds = time.perf_counter() - start
+
+    chunks = [" ".join(CRE_SENTENCES[(i + j) % len(CRE_SENTENCES)] for j in range(8)) for i in range(bulk)]
+    start = time.perf_counter()
+    for offset in range(0, bulk, 256):
+        provider.embed(chunks[offset:offset + 256])
+    bulk_seconds = time.perf_counter() - start
+
+    return {
+        "query_latency_ms_p50": float(np.percentile(latencies, 50)),
+        "query_latency_ms_p95": float(np.percentile(latencies, 95)),
+        "concurrent_queries_per_second": queries / concurrent_seconds,
+        "bulk_texts_per_second": bulk / bulk_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=TINY_MODEL, help="Directory with model.onnx and tokenizer.json")
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime threads (EMBEDDING_THREADS)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bulk", type=int, default=1024, help="Chunks embedded in the ingest phase")
+    parser.add_argument("--remote", choices=["fake", "azure"], default="fake")
+    parser.add_argument("--remote-latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    if args.remote == "fake":
+        for var in ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_KEY",
+                    "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME"):
+            os.environ.setdefault(var, "offline")
+    from openai import AzureOpenAI
+    from app.config import (AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT,
+                            AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME, EMBEDDING_THREADS)
+    from src.embeddings import AzureEmbeddingProvider, OnnxEmbeddingProvider
+
+    threads = args.threads or EMBEDDING_THREADS
+    local = OnnxEmbeddingProvider(args.model, threads=threads)
+    report = {"model": os.path.abspath(args.model), "threads": threads, "concurrency": args.concurrency}
+    report["local"] = measure(local, args.queries, args.concurrency, args.bulk)
+    report["local"]["batches"] = local.batcher.batches
+    local.close()
+
+    if args.remote == "fake":
+        with FakeAzureOpenAIProcess(FakeServerConfig(latency_ms=args.remote_latency_ms)) as server:
+            client = AzureOpenAI(api_key="offline", api_version="2023-12-01-preview",
+                                 azure_endpoint=server.endpoint)
+            remote = AzureEmbeddingProvider(client, "bench-embedding")
+            report["remote"] = measure(remote, args.queries, args.concurrency, args.bulk)
+        report["remote"]["simulated_latency_ms"] = args.remote_latency_ms
+    else:
+        client = AzureOpenAI(api_key=AZURE_OPENAI_API_KEY, api_version="2023-12-01-preview",
+                             azure_endpoint=AZURE_OPENAI_ENDPOINT)
+        remote = AzureEmbeddingProvider(client, AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME)
+        report["remote"] = measure(remote, args.queries, args.concurrency, args.bulk)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
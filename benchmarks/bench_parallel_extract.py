@@ -0,0 +1,56 @@
+"""
+Benchmark intra-document parallel page extraction by worker count.
+
+Uses a PDF from --pdf, or generates a synthetic loan document of --pages
+pages, and times PDFProcessor.extract_pages for each worker count.
+
+Usage:
+    python -m benchmarks.bench_parallel_extract --pages 1500 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import time
+from io import BytesIO
+
+from benchmarks.corpus import make_cre_pdf
+from src.pdf_processor import PDFProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pdf", help="Path to a PDF; a synthetic one is generated if omitted")
+    parser.add_argument("--pages", type=int, default=1500)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pdf:
+        with open(args.pdf, "rb") as f:
+            pdf_bytes = f.read()
+    else:
+        pdf_bytes = make_cre_pdf(args.pages)
+
+    report = {"cpu_count": os.cpu_count(), "pdf_bytes": len(pdf_bytes), "runs": []}
+    baseline = None
+    for workers in args.workers:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            pages = PDFProcessor.extract_pages(BytesIO(pdf_bytes), workers=workers)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        baseline = baseline or best
+        report["runs"].append({
+            "workers": workers,
+            "pages": len(pages),
+            "seconds": best,
+            "pages_per_second": len(pages) / best,
+            "speedup": baseline / best,
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark embedding quantization: memory per vector and recall@k.
+
+Builds a synthetic clustered corpus shaped like Azure text-embedding output
+(default 1,536 dims), then compares each quantization mode against exact
+float32 search, with and without full-precision rescoring.
+
+Usage:
+    python -m benchmarks.bench_quantization --vectors 50000 --dim 1536 --k 10
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from src.vector_store import VectorStore, normalize
+
+
+def make_corpus(n: int, dim: int, clusters: int, seed: int = 0):
+    """Generate clustered unit vectors plus noisy queries drawn near them."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    corpus = normalize(centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32))
+    return corpus, rng
+
+
+def python_list_bytes(dim: int) -> int:
+    """Approximate bytes held by one embedding as a list of Python floats."""
+    vector = [float(x) for x in np.random.default_rng(1).normal(size=dim)]
+    return sys.getsizeof(vector) + sum(sys.getsizeof(x) for x in vector)
+
+
+def recall_at_k(results, truth, k):
+    """Average fraction of the exact top-k found in the returned ids."""
+    hits = [len(set(r[:k]) & set(t[:k])) / k for r, t in zip(results, truth)]
+    return float(np.mean(hits))
+
+
+def run(n: int, dim: int, k: int, queries: int, clusters: int, rescore_factor: int):
+    """Run the benchmark and return a report dict."""
+    corpus, rng = make_corpus(n, dim, clusters)
+    picks = rng.integers(0, n, size=queries)
+    query_vectors = normalize(corpus[picks] + 0.3 * rng.normal(size=(queries, dim)).astype(np.float32))
+    ids = [str(i) for i in range(n)]
+
+    report = {"vectors": n, "dim": dim, "k": k, "queries": queries,
+              "python_list_bytes_per_vector": python_list_bytes(dim), "modes": {}}
+    truth = None
+    for mode in ("none", "float16", "int8"):
+        for factor in ((1,) if mode == "none" else (1, rescore_factor)):
+            store = VectorStore(name=f"bench_{mode}", quantization=mode, rescore_factor=factor)
+            store.add(ids=ids, embeddings=corpus)
+            start = time.perf_counter()
+            results = store.query(query_embeddings=query_vectors, n_results=k)["ids"]
+            elapsed = time.perf_counter() - start
+            if truth is None:
+                truth = results
+            label = mode if mode == "none" else f"{mode}/rescore_x{factor}"
+            report["modes"][label] = {
+                "bytes_per_vector_in_memory": store.memory_usage()["bytes_per_vector"],
+                f"recall@{k}": recall_at_k(results, truth, k),
+                "query_ms": 1000 * elapsed / queries,
+            }
+            store.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    args = parser.parse_args()
+    report = run(args.vectors, args.dim, args.k, args.queries, args.clusters, args.rescore_factor)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Synthetic CRE document generator for benchmarks and tests.
+
+Writes small, valid PDFs with real text content streams so extraction code
+can be exercised without shipping large binary fixtures.
+"""
+import random
+from typing import Dict, List, Optional, Tuple
+
+CRE_SENTENCES = [
+    "The Borrower shall maintain a Debt Service Coverage Ratio of not less than 1.25 to 1.00.",
+    "Loan-to-Value (LTV) means the ratio of the outstanding principal balance to the appraised value.",
+    "Net Operating Income is calculated as effective gross income less operating expenses.",
+    "The capitalization rate for the subject property was concluded at 6.25 percent.",
+    "Debt yield means net operating income divided by the outstanding loan amount.",
+    "All rents shall be deposited into the Clearing Account for the benefit of Lender.",
+    "The Property is a 120,000 square foot multi-tenant office building built in 1998.",
+    "Tenant improvements and leasing commissions are reserved at $1.50 per square foot.",
+    "An Event of Default shall occur if any payment is not made within five days of the due date.",
+    "The appraiser reconciled the income and sales comparison approaches to value.",
+    "Guarantor shall be liable for losses arising from fraud or misappropriation of rents.",
+    "The interest rate is fixed at 5.75 percent with a 30-year amortization schedule.",
+]
+
+
+def _escape(text: str) -> str:
+    """Escape a string for a PDF literal."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a PDF where each page shows the given lines of text."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages object, filled in once page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        for line in lines:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def loan_document_pages(num_pages: int, lines_per_page: int = 50, seed: Optional[int] = 0) -> List[List[str]]:
+    """Generate pages of loan-document style prose."""
+    rng = random.Random(seed)
+    pages = []
+    for page_number in range(1, num_pages + 1):
+        lines = [f"Section {page_number}. Loan Agreement"]
+        lines += [rng.choice(CRE_SENTENCES) for _ in range(lines_per_page - 1)]
+        pages.append(lines)
+    return pages
+
+
+def rent_roll_pages(num_pages: int, rows_per_page: int = 40, seed: Optional[int] = 0) -> List[List[str]]:
+    """Generate pages of a rent roll table with a header row on each page."""
+    rng = random.Random(seed)
+    tenants = ["Acme Dental", "Blue Bottle Coffee", "Summit Legal LLP", "Vacant",
+               "Northwind Traders", "Harbor Insurance", "Keystone Fitness"]
+    header = "Unit    Tenant    SF    Lease Start    Lease End    Annual Rent    Rent PSF"
+    pages = []
+    unit = 100
+    for page_number in range(1, num_pages + 1):
+        lines = [f"Rent Roll - Page {page_number}", header]
+        for _ in range(rows_per_page):
+            unit += 1
+            sf = rng.randrange(800, 12000, 50)
+            psf = round(rng.uniform(18, 45), 2)
+            start_year = rng.randrange(2015, 2024)
+            lines.append(f"{unit}    {rng.choice(tenants)}    {sf:,}    01/01/{start_year}    "
+                         f"12/31/{start_year + rng.randrange(3, 11)}    ${sf * psf:,.2f}    ${psf:.2f}")
+        pages.append(lines)
+    return pages
+
+
+def appraisal_pages(num_pages: int, seed: Optional[int] = 0) -> List[List[str]]:
+    """Generate pages of an appraisal with narrative text and an income summary."""
+    rng = random.Random(seed)
+    pages = []
+    for page_number in range(1, num_pages + 1):
+        gross = rng.randrange(2_000_000, 6_000_000, 1000)
+        vacancy = round(gross * 0.05)
+        expenses = round(gross * rng.uniform(0.3, 0.45))
+        noi = gross - vacancy - expenses
+        lines = [f"Appraisal Report - Income Approach ({page_number})"]
+        lines += [rng.choice(CRE_SENTENCES) for _ in range(15)]
+        lines += [
+            "Line Item    Amount",
+            f"Potential Gross Income    ${gross:,}",
+            f"Vacancy and Collection Loss    (${vacancy:,})",
+            f"Operating Expenses    (${expenses:,})",
+            f"Net Operating Income    ${noi:,}",
+        ]
+        pages.append(lines)
+    return pages
+
+
+def synthetic_corpus(pages_per_document: int = 50) -> Dict[str, Tuple[bytes, List[str]]]:
+    """Build named loan, rent roll and appraisal PDFs with their reference page texts."""
+    documents = {
+        "loan_agreement": loan_document_pages(pages_per_document),
+        "rent_roll": rent_roll_pages(pages_per_document),
+        "appraisal": appraisal_pages(pages_per_document),
+    }
+    return {name: (make_pdf(pages), ["\n".join(lines) for lines in pages])
+            for name, pages in documents.items()}
+
+
+def make_cre_pdf(num_pages: int, lines_per_page: int = 50, seed: Optional[int] = 0) -> bytes:
+    """Build a multi-page PDF of loan-document style prose."""
+    return make_pdf(loan_document_pages(num_pages, lines_per_page, seed))
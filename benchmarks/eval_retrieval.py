@@ -0,0 +1,290 @@
+"""
+Offline retrieval quality vs. cost evaluation.
+
+Sweeps chunk size, overlap, k and retrieval mode (quantization, or
+hierarchical small-to-big) over a labeled set of CRE questions with gold
+passages, and reports recall@k, MRR, prompt tokens per query and retrieval
+latency for every configuration, marking those on the Pareto frontier
+(highest recall for the fewest prompt tokens and lowest latency).
+
+The labeled set is JSON: {"documents": {name: text}, "questions":
+[{"question", "document", "gold": [passage, ...]}]}. A chunk counts as a hit
+when it covers at least half of a gold passage, or lies mostly inside one.
+
+Embeddings come from a deterministic hashed bag-of-words embedder by
+default, so the sweep runs without network access. --embedder azure uses
+the configured deployment, cached on disk by text hash so reruns are free.
+
+Usage:
+    python -m benchmarks.eval_retrieval --chunk-sizes 300,600,1000 --overlaps 0,100,200 \\
+        --ks 1,3,5 --modes none,int8 --output benchmarks/results/retrieval.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.fake_azure_openai import hash_embedding
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(__file__), "data", "cre_eval.json")
+
+
+class CachedEmbedder:
+    """Memoizes an embedding function by text hash, optionally persisted to an .npz file."""
+
+    def __init__(self, embed: Callable[[List[str]], np.ndarray], path: Optional[str] = None):
+        self.embed = embed
+        self.path = path
+        self._cache: Dict[str, np.ndarray] = {}
+        if path and os.path.exists(path):
+            with np.load(path) as saved:
+                self._cache = {key: saved[key] for key in saved.files}
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        keys = [self._key(t) for t in texts]
+        missing = list({k: t for k, t in zip(keys, texts) if k not in self._cache}.items())
+        if missing:
+            vectors = self.embed([t for _, t in missing])
+            for (key, _), vector in zip(missing, vectors):
+                self._cache[key] = np.asarray(vector, dtype=np.float32)
+        return np.stack([self._cache[k] for k in keys])
+
+    def save(self):
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            np.savez(self.path, **self._cache)
+
+
+def hash_embedder(dim: int = 256) -> Callable[[List[str]], np.ndarray]:
+    """Deterministic local embedder: hashed bag of words."""
+    return lambda texts: np.stack([hash_embedding(t, dim) for t in texts])
+
+
+def azure_embedder() -> Callable[[List[str]], np.ndarray]:
+    """Embed with the configured Azure OpenAI embedding deployment."""
+    from app.config import AZURE_OPENAI_DEPLOYMENT_NAME
+    from src.rag_engine import RAGEngine
+
+    engine = RAGEngine(AZURE_OPENAI_DEPLOYMENT_NAME)
+    return engine.create_embeddings
+
+
+def load_dataset(path: str) -> dict:
+    """Load the labeled set and locate each gold passage in its cleaned document."""
+    from src.pdf_processor import PDFProcessor
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    documents = {name: PDFProcessor.clean_text(text) for name, text in data["documents"].items()}
+    for question in data["questions"]:
+        text = documents[question["document"]]
+        spans = []
+        for passage in question["gold"]:
+            passage = PDFProcessor.clean_text(passage)
+            start = text.find(passage)
+            if start < 0:
+                raise ValueError(f"Gold passage not found in {question['document']}: {passage[:60]}")
+            spans.append((start, start + len(passage)))
+        question["spans"] = spans
+    data["documents"] = documents
+    return data
+
+
+def is_hit(chunk: Tuple[int, int], gold: Tuple[int, int]) -> bool:
+    """Whether a chunk span covers half of a gold span or lies mostly inside it."""
+    overlap = min(chunk[1], gold[1]) - max(chunk[0], gold[0])
+    if overlap <= 0:
+        return False
+    return overlap >= 0.5 * (gold[1] - gold[0]) or overlap >= 0.5 * (chunk[1] - chunk[0])
+
+
+def score(ranked: List[Tuple[str, int, int]], question: dict, k: int) -> Tuple[float, float]:
+    """Return (recall@k, reciprocal rank) for ranked (document, start, end) chunks."""
+    found = set()
+    first_rank = None
+    for rank, (document, start, end) in enumerate(ranked[:k], start=1):
+        if document != question["document"]:
+            continue
+        for i, gold in enumerate(question["spans"]):
+            if is_hit((start, end), gold):
+                found.add(i)
+                first_rank = first_rank or rank
+    recall = len(found) / len(question["spans"])
+    return recall, (1.0 / first_rank if first_rank else 0.0)
+
+
+def prompt_tokens(question: str, documents: List[str]) -> int:
+    """Estimate tokens of the prompt RAGEngine would send for these retrieved chunks."""
+    from src.conversation import estimate_tokens
+    from src.rag_engine import SYSTEM_PROMPT
+
+    context = "\n".join(documents)
+    return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(f"Context: {context}\n\nQuestion: {question}")
+
+
+def _score_ks(search: Callable[[np.ndarray, int], Tuple[List[str], List[dict]]], questions: List[dict],
+              question_vectors: np.ndarray, ks: List[int], config: Dict[str, object]) -> List[Dict[str, object]]:
+    """Score one index at every k; search returns the context texts and their metadata."""
+    rows = []
+    for k in ks:
+        recalls, reciprocal_ranks, tokens, latencies = [], [], [], []
+        for question, vector in zip(questions, question_vectors):
+            start = time.perf_counter()
+            documents, metadatas = search(vector, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            ranked = [(m["document"], m["start_char"], m["end_char"]) for m in metadatas]
+            recall, rr = score(ranked, question, k)
+            recalls.append(recall)
+            reciprocal_ranks.append(rr)
+            tokens.append(prompt_tokens(question["question"], documents))
+        rows.append({
+            **config,
+            "k": k,
+            "recall_at_k": float(np.mean(recalls)),
+            "mrr": float(np.mean(reciprocal_ranks)),
+            "prompt_tokens": float(np.mean(tokens)),
+            "latency_ms_p50": float(np.percentile(latencies, 50)),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+        })
+    return rows
+
+
+def _build_store(name: str, mode: str, chunks: List[Tuple[str, str, dict]], vectors: np.ndarray):
+    from src.vector_store import VectorStore
+
+    store = VectorStore(name=name, quantization=mode)
+    store.add(ids=[str(i) for i in range(len(chunks))], embeddings=vectors,
+              documents=[text for _, text, _ in chunks],
+              metadatas=[{"document": doc, **meta} for doc, _, meta in chunks])
+    return store
+
+
+def evaluate(data: dict, embed: CachedEmbedder, chunk_sizes: List[int], overlaps: List[int],
+             ks: List[int], modes: List[str]) -> List[Dict[str, object]]:
+    """Run the sweep and return one result row per configuration.
+    
+    Modes are VectorStore quantization modes, plus "hierarchical": sentence
+    children are searched and expanded to parent sections of chunk_size
+    (parents never overlap, so it runs once per chunk size).
+    """
+    from app.config import CHILD_CANDIDATES, PARENT_TOKEN_BUDGET
+    from src.docstore import DocStore, expand_to_parents
+    from src.pdf_processor import PDFProcessor
+
+    questions = data["questions"]
+    question_vectors = embed([q["question"] for q in questions])
+    flat_modes = [mode for mode in modes if mode != "hierarchical"]
+    results = []
+
+    for chunk_size in chunk_sizes:
+        for overlap in overlaps:
+            if overlap >= chunk_size or not flat_modes:
+                continue
+            chunks = [(name, text, {"start_char": m["start_char"], "end_char": m["end_char"]})
+                      for name, document in data["documents"].items()
+                      for text, m in PDFProcessor.create_chunks(document, chunk_size, overlap)]
+            vectors = embed([text for _, text, _ in chunks])
+
+            for mode in flat_modes:
+                store = _build_store(f"eval_{chunk_size}_{overlap}_{mode}", mode, chunks, vectors)
+
+                def search(vector, k):
+                    hits = store.query(query_embeddings=[vector], n_results=k)
+                    return hits["documents"][0], hits["metadatas"][0]
+
+                config = {"chunk_size": chunk_size, "overlap": overlap, "mode": mode, "chunks": len(chunks)}
+                results.extend(_score_ks(search, questions, question_vectors, ks, config))
+                store.close()
+
+        if "hierarchical" in modes:
+            docstore = DocStore()
+            children = []
+            for name, document in data["documents"].items():
+                for text, m in PDFProcessor.create_hierarchical_chunks(document, chunk_size):
+                    meta = {"document": name, "start_char": m["start_char"], "end_char": m["end_char"]}
+                    parent_id = f"{name}_{m['parent_index']}"
+                    if m["chunk_type"] == "parent":
+                        docstore.add([parent_id], [text], [meta])
+                    else:
+                        children.append((name, text, {**meta, "parent_id": parent_id}))
+            store = _build_store(f"eval_{chunk_size}_hierarchical", "none", children,
+                                 embed([text for _, text, _ in children]))
+
+            def search(vector, k):
+                hits = store.query(query_embeddings=[vector], n_results=k * CHILD_CANDIDATES)
+                expanded = expand_to_parents(hits, docstore, k, PARENT_TOKEN_BUDGET)
+                return [text for _, text, _ in expanded], [meta for _, _, meta in expanded]
+
+            config = {"chunk_size": chunk_size, "overlap": 0, "mode": "hierarchical", "chunks": len(children)}
+            results.extend(_score_ks(search, questions, question_vectors, ks, config))
+            store.close()
+
+    mark_pareto(results)
+    return results
+
+
+def mark_pareto(results: List[Dict[str, object]]):
+    """Flag rows no other row beats on recall, MRR, prompt tokens and p50 latency at once."""
+    def dominates(a, b):
+        better_or_equal = (a["recall_at_k"] >= b["recall_at_k"] and a["mrr"] >= b["mrr"]
+                           and a["prompt_tokens"] <= b["prompt_tokens"]
+                           and a["latency_ms_p50"] <= b["latency_ms_p50"])
+        strictly_better = (a["recall_at_k"] > b["recall_at_k"] or a["mrr"] > b["mrr"]
+                           or a["prompt_tokens"] < b["prompt_tokens"]
+                           or a["latency_ms_p50"] < b["latency_ms_p50"])
+        return better_or_equal and strictly_better
+
+    for row in results:
+        row["pareto"] = not any(dominates(other, row) for other in results if other is not row)
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dataset", default=DEFAULT_DATASET)
+    parser.add_argument("--chunk-sizes", type=_ints, default=[300, 600, 1000])
+    parser.add_argument("--overlaps", type=_ints, default=[0, 100, 200])
+    parser.add_argument("--ks", type=_ints, default=[1, 3, 5])
+    parser.add_argument("--modes", default="none,int8", help="Comma-separated VectorStore quantization modes and/or hierarchical")
+    parser.add_argument("--embedder", choices=["hash", "azure"], default="hash")
+    parser.add_argument("--cache", help="Persist embeddings to this .npz file")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    if args.embedder == "hash":
+        # The local embedder needs no credentials; satisfy app.config's validation
+        for var in ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_KEY",
+                    "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME"):
+            os.environ.setdefault(var, "offline")
+    embed = CachedEmbedder(hash_embedder() if args.embedder == "hash" else azure_embedder(), args.cache)
+
+    results = evaluate(load_dataset(args.dataset), embed, args.chunk_sizes, args.overlaps,
+                       args.ks, args.modes.split(","))
+    embed.save()
+
+    print(f"{'chunk':>6} {'overlap':>7} {'k':>3} {'mode':>12} {'recall':>7} {'mrr':>6} "
+          f"{'tokens':>7} {'p50 ms':>7}  pareto")
+    for row in sorted(results, key=lambda r: (-r["recall_at_k"], r["prompt_tokens"])):
+        print(f"{row['chunk_size']:>6} {row['overlap']:>7} {row['k']:>3} {row['mode']:>12} "
+              f"{row['recall_at_k']:>7.3f} {row['mrr']:>6.3f} {row['prompt_tokens']:>7.0f} "
+              f"{row['latency_ms_p50']:>7.3f}  {'*' if row['pareto'] else ''}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"dataset": args.dataset, "embedder": args.embedder, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Local stand-in for the Azure OpenAI embeddings and chat completions endpoints.
+
+Serves the Azure deployment routes used by the openai SDK with configurable
+latency, token throughput and 429 injection, so ingestion and querying can
+be load-tested without network access or quota. Embeddings are hashed
+bag-of-words vectors, so similar texts land near each other.
+
+Usage:
+    python -m benchmarks.fake_azure_openai --port 8089 --latency-ms 50 --rate-limit 0.05
+"""
+import argparse
+import base64
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.request import urlopen
+
+import numpy as np
+
+ROUTE = re.compile(r"^/openai/deployments/(?P<deployment>[^/]+)/(?P<operation>embeddings|chat/completions)")
+ANSWER_WORDS = ("The loan-to-value ratio compares the loan amount to the appraised value "
+                "of the property and is a key underwriting metric for lenders.").split()
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour knobs for the fake endpoints."""
+    latency_ms: float = 20.0           # Fixed overhead per request
+    jitter_ms: float = 5.0             # Uniform random extra latency
+    embedding_ms_per_input: float = 0.5
+    tokens_per_second: float = 200.0   # Chat generation throughput
+    answer_tokens: int = 60
+    rate_limit: float = 0.0            # Probability of answering 429
+    retry_after: float = 0.05          # Seconds advertised in Retry-After
+    dim: int = 256
+
+
+@dataclass
+class FakeServerStats:
+    """Counters for requests served by the fake endpoints."""
+    embeddings: int = 0
+    embedded_inputs: int = 0
+    chat: int = 0
+    rate_limited: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def bump(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"embeddings": self.embeddings, "embedded_inputs": self.embedded_inputs,
+                "chat": self.chat, "rate_limited": self.rate_limited}
+
+
+def hash_embedding(text: str, dim: int) -> np.ndarray:
+    """Embed text as a normalized hashed bag of words."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dim
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler bound to a FakeAzureOpenAI instance via the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, status: int, payload: dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server.stats.as_dict())
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown route {self.path}"}})
+
+    def do_POST(self):
+        config: FakeServerConfig = self.server.config
+        stats: FakeServerStats = self.server.stats
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        match = ROUTE.match(self.path)
+        if not match:
+            self._send_json(404, {"error": {"message": f"Unknown route {self.path}"}})
+            return
+
+        time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000)
+        if random.random() < config.rate_limit:
+            stats.bump(rate_limited=1)
+            self._send_json(429, {"error": {"code": "429", "message": "Rate limit is exceeded."}},
+                            {"Retry-After": str(config.retry_after)})
+            return
+
+        if match.group("operation") == "embeddings":
+            self._embeddings(request, config, stats)
+        elif request.get("stream"):
+            self._chat_stream(request, config, stats)
+        else:
+            self._chat(request, config, stats)
+
+    def _embeddings(self, request: dict, config: FakeServerConfig, stats: FakeServerStats):
+        inputs = request["input"]
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        time.sleep(config.embedding_ms_per_input * len(inputs) / 1000)
+        data = []
+        for index, text in enumerate(inputs):
+            vector = hash_embedding(text, config.dim)
+            if request.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode()
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        tokens = sum(len(text.split()) for text in inputs)
+        stats.bump(embeddings=1, embedded_inputs=len(inputs))
+        self._send_json(200, {"object": "list", "data": data, "model": "fake-embedding",
+                              "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _answer_tokens(self, request: dict, config: FakeServerConfig) -> List[str]:
+        count = min(config.answer_tokens, request.get("max_tokens") or config.answer_tokens)
+        return [ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(count)]
+
+    def _chat(self, request: dict, config: FakeServerConfig, stats: FakeServerStats):
+        tokens = self._answer_tokens(request, config)
+        time.sleep(len(tokens) / config.tokens_per_second)
+        prompt_tokens = sum(len(m.get("content", "")) // 4 for m in request.get("messages", []))
+        stats.bump(chat=1)
+        self._send_json(200, {
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+            "model": "fake-chat",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": " ".join(tokens)}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                      "total_tokens": prompt_tokens + len(tokens)},
+        })
+
+    def _chat_stream(self, request: dict, config: FakeServerConfig, stats: FakeServerStats):
+        stats.bump(chat=1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send_event(payload: str):
+            data = f"data: {payload}\n\n".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        for i, token in enumerate(self._answer_tokens(request, config)):
+            time.sleep(1 / config.tokens_per_second)
+            send_event(json.dumps({
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": "fake-chat",
+                "choices": [{"index": 0, "finish_reason": None,
+                             "delta": {"content": token if i == 0 else " " + token}}],
+            }))
+        send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class FakeAzureOpenAI:
+    """Threaded HTTP server emulating Azure OpenAI; usable as a context manager."""
+
+    def __init__(self, config: FakeServerConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeServerConfig()
+        self.stats = FakeServerStats()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.config = self.config
+        self._server.stats = self.stats
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAzureOpenAI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _serve(config: FakeServerConfig, ready):
+    """Subprocess entry point: serve forever and report the bound endpoint."""
+    server = FakeAzureOpenAI(config)
+    ready.send(server.endpoint)
+    server._server.serve_forever()
+
+
+class FakeAzureOpenAIProcess:
+    """Runs the fake server in a child process so it doesn't share the client's GIL or RSS."""
+
+    def __init__(self, config: FakeServerConfig = None):
+        self.config = config or FakeServerConfig()
+        self.endpoint = None
+        self._process = None
+
+    def start(self) -> "FakeAzureOpenAIProcess":
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(self.config, child), daemon=True)
+        self._process.start()
+        self.endpoint = parent.recv()
+        return self
+
+    def stats(self) -> Dict[str, int]:
+        with urlopen(f"{self.endpoint}/stats") as response:
+            return json.loads(response.read())
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+    config = FakeServerConfig(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second,
+                              rate_limit=args.rate_limit, dim=args.dim)
+    server = FakeAzureOpenAI(config, port=args.port)
+    print(f"Fake Azure OpenAI listening on {server.endpoint}")
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+End-to-end load test of ingestion and querying against a fake Azure OpenAI.
+
+Starts benchmarks.fake_azure_openai in a child process, ingests synthetic
+loan documents through PDFProcessor and RAGEngine.add_documents, then
+fires RAGEngine queries at the requested concurrency. Reports throughput,
+p50/p95/p99 latency, time-to-first-token (streaming), 429s seen and peak
+RSS, and writes the report as JSON. Pass --baseline with an earlier report
+to flag regressions beyond --tolerance.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 16 --queries 500 --rate-limit 0.05 \\
+        --output benchmarks/results/latest.json --baseline benchmarks/results/main.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.corpus import make_cre_pdf
+from benchmarks.fake_azure_openai import FakeAzureOpenAIProcess, FakeServerConfig
+
+QUESTIONS = [
+    "What is LTV?",
+    "How is DSCR calculated?",
+    "What is the debt yield?",
+    "What is the capitalization rate for the property?",
+    "When does an Event of Default occur?",
+    "What reserves are required for tenant improvements?",
+    "What is the interest rate and amortization?",
+    "Who is liable for misappropriation of rents?",
+]
+
+# Metrics compared against a baseline, and whether higher is better
+TRACKED_METRICS = {
+    "ingest.pages_per_second": True,
+    "query.throughput_qps": True,
+    "query.latency_ms.p95": False,
+    "query.latency_ms.p99": False,
+    "query.ttft_ms.p95": False,
+    "peak_rss_mb": False,
+}
+
+
+@dataclass
+class LoadTestOptions:
+    """Workload shape and fake server behaviour for one run."""
+    concurrency: int = 8
+    queries: int = 200
+    documents: int = 4
+    pages_per_document: int = 20
+    stream: bool = True
+    quantization: str = "none"
+    server: FakeServerConfig = field(default_factory=FakeServerConfig)
+
+
+def summarize(values_ms: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99/mean/max of a latency sample in milliseconds."""
+    if not values_ms:
+        return {}
+    values = np.asarray(values_ms)
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean()),
+        "max": float(values.max()),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_engine(endpoint: str, quantization: str):
+    """Create a RAGEngine whose model client points at the fake endpoint."""
+    for var in ("AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_KEY", "AZURE_OPENAI_API_KEY",
+                "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME"):
+        os.environ.setdefault(var, endpoint if var == "AZURE_OPENAI_ENDPOINT" else "load-test")
+    # Import late so app.config validates against the variables set above
+    from openai import AzureOpenAI
+    from src.embeddings import AzureEmbeddingProvider
+    from src.rag_engine import RAGEngine
+
+    engine = RAGEngine("load-test-chat", quantization=quantization)
+    engine.client = AzureOpenAI(api_key="load-test", api_version="2023-12-01-preview",
+                                azure_endpoint=endpoint, max_retries=5)
+    if engine.embedder.name == "azure":
+        engine.embedder = AzureEmbeddingProvider(engine.client, "load-test-embedding")
+    return engine
+
+
+def run_ingestion(engine, options: LoadTestOptions) -> Dict[str, object]:
+    """Process and index synthetic PDFs concurrently."""
+    from src.pdf_processor import PDFProcessor
+
+    documents = [make_cre_pdf(options.pages_per_document, seed=i) for i in range(options.documents)]
+
+    def ingest(index: int) -> float:
+        start = time.perf_counter()
+        chunks = PDFProcessor().process_pdf(BytesIO(documents[index]))
+        engine.add_documents([text for text, _ in chunks],
+                             [{"source": f"doc_{index}.pdf", **metadata} for _, metadata in chunks])
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.concurrency) as pool:
+        latencies = list(pool.map(ingest, range(options.documents)))
+    elapsed = time.perf_counter() - start
+    pages = options.documents * options.pages_per_document
+    return {
+        "documents": options.documents,
+        "pages": pages,
+        "seconds": elapsed,
+        "pages_per_second": pages / elapsed,
+        "document_latency_ms": summarize(latencies),
+    }
+
+
+def run_queries(engine, options: LoadTestOptions) -> Dict[str, object]:
+    """Fire queries at the configured concurrency, timing total latency and TTFT."""
+    def ask(index: int) -> Dict[str, Optional[float]]:
+        question = QUESTIONS[index % len(QUESTIONS)]
+        start = time.perf_counter()
+        try:
+            if options.stream:
+                result = engine.stream_query(question)
+                ttft = None
+                for _ in result["answer_stream"]:
+                    if ttft is None:
+                        ttft = (time.perf_counter() - start) * 1000
+            else:
+                engine.query(question)
+                ttft = None
+        except Exception as e:
+            return {"error": str(e)}
+        return {"latency": (time.perf_counter() - start) * 1000, "ttft": ttft}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.concurrency) as pool:
+        outcomes = list(pool.map(ask, range(options.queries)))
+    elapsed = time.perf_counter() - start
+    completed = [o for o in outcomes if "error" not in o]
+    return {
+        "queries": options.queries,
+        "errors": len(outcomes) - len(completed),
+        "seconds": elapsed,
+        "throughput_qps": len(completed) / elapsed,
+        "latency_ms": summarize([o["latency"] for o in completed]),
+        "ttft_ms": summarize([o["ttft"] for o in completed if o["ttft"] is not None]),
+    }
+
+
+def run_load_test(options: LoadTestOptions) -> Dict[str, object]:
+    """Run ingestion then querying against a fresh fake server and return the report."""
+    with FakeAzureOpenAIProcess(options.server) as server:
+        engine = build_engine(server.endpoint, options.quantization)
+        ingest = run_ingestion(engine, options)
+        queries = run_queries(engine, options)
+        server_stats = server.stats()
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "options": asdict(options),
+        "ingest": ingest,
+        "query": queries,
+        "server": server_stats,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _lookup(report: dict, dotted: str) -> Optional[float]:
+    value = report
+    for key in dotted.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """List tracked metrics that got worse than the baseline by more than tolerance."""
+    regressions = []
+    for metric, higher_is_better in TRACKED_METRICS.items():
+        new, old = _lookup(report, metric), _lookup(baseline, metric)
+        if not new or not old:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{metric}: {old:.2f} -> {new:.2f} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthetic document")
+    parser.add_argument("--no-stream", action="store_true", help="Use query() instead of stream_query()")
+    parser.add_argument("--quantization", default="none", choices=["none", "float16", "int8"])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--answer-tokens", type=int, default=60)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Probability of a 429")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    options = LoadTestOptions(
+        concurrency=args.concurrency, queries=args.queries, documents=args.documents,
+        pages_per_document=args.pages, stream=not args.no_stream, quantization=args.quantization,
+        server=FakeServerConfig(latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second,
+                                answer_tokens=args.answer_tokens, rate_limit=args.rate_limit),
+    )
+    report = run_load_test(options)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
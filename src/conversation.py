@@ -0,0 +1,76 @@
+"""
+Conversation state for follow-up aware querying.
+"""
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterator, List, Optional
+
+from app.config import MAX_HISTORY_MESSAGES
+
+# Rewrites are short; a few dozen per conversation covers any realistic session
+MAX_CACHED_REWRITES = 64
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class ConversationHistory:
+    """Capped chat history with a token-budgeted window and a rewrite cache."""
+
+    def __init__(self, max_messages: int = MAX_HISTORY_MESSAGES,
+                 conversation_id: Optional[str] = None):
+        """Create an empty history holding at most max_messages messages."""
+        self.conversation_id = conversation_id or uuid.uuid4().hex
+        self.messages: Deque[Dict[str, str]] = deque(maxlen=max_messages)
+        self.turns = 0
+        self._rewrites: "OrderedDict[tuple, str]" = OrderedDict()
+
+    def append(self, role: str, content: str):
+        """Append a message, dropping the oldest once the cap is reached."""
+        self.messages.append({"role": role, "content": content})
+        self.turns += 1
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self.messages)
+
+    def window(self, token_budget: int) -> List[Dict[str, str]]:
+        """Return the most recent messages that fit in the token budget, oldest first."""
+        selected = []
+        used = 0
+        for message in reversed(self.messages):
+            cost = estimate_tokens(message["content"])
+            if used + cost > token_budget:
+                break
+            selected.append(message)
+            used += cost
+        selected.reverse()
+        return selected
+
+    def _rewrite_key(self, question: str) -> tuple:
+        """Key rewrites by question and history position so new turns invalidate them."""
+        return (question.strip().lower(), self.turns)
+
+    def cached_rewrite(self, question: str) -> Optional[str]:
+        """Return a previously computed rewrite for the question at this turn."""
+        key = self._rewrite_key(question)
+        if key in self._rewrites:
+            self._rewrites.move_to_end(key)
+            return self._rewrites[key]
+        return None
+
+    def store_rewrite(self, question: str, rewritten: str):
+        """Cache a rewrite, evicting the least recently used entry when full."""
+        self._rewrites[self._rewrite_key(question)] = rewritten
+        if len(self._rewrites) > MAX_CACHED_REWRITES:
+            self._rewrites.popitem(last=False)
+
+    def clear(self):
+        """Drop all messages and cached rewrites."""
+        self.messages.clear()
+        self._rewrites.clear()
+        self.turns = 0
@@ -0,0 +1,154 @@
+"""
+Near-duplicate chunk detection with MinHash signatures and LSH banding.
+
+Loan agreements and CMBS documents repeat large blocks of boilerplate
+across files. Each chunk gets a MinHash signature over its word shingles;
+LSH bands bucket signatures so only likely matches are compared. A chunk
+is a duplicate when its estimated Jaccard similarity with an indexed chunk
+reaches the threshold and both contain exactly the same figures, so
+boilerplate that differs in a rate, amount or date is kept apart.
+"""
+import logging
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import (
+    DEDUP_THRESHOLD,
+    MINHASH_PERMUTATIONS,
+    LSH_BANDS,
+    SHINGLE_SIZE
+)
+from src.conversation import estimate_tokens
+
+logger = logging.getLogger('rag')
+
+# Prime just above 2**32; hash coefficients stay below 2**31 so a * x + b fits in uint64
+MINHASH_PRIME = np.uint64(4294967311)
+# Words and figures, without surrounding punctuation
+WORD = re.compile(r"[a-z0-9$%]+(?:[.,/-][a-z0-9%]+)*")
+NUMBER = re.compile(r"\d[\d,./%-]*")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hash the word n-grams of a text to 32-bit integers."""
+    words = WORD.findall(text.lower())
+    if len(words) < size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)))
+
+
+def figures(text: str) -> frozenset:
+    """The set of numbers a chunk states; duplicates must agree on them exactly."""
+    return frozenset(NUMBER.findall(text))
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures with universal hashing."""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> np.ndarray:
+        hashed = shingles(text)
+        return ((self._a * hashed[None, :] + self._b) % MINHASH_PRIME).min(axis=1).astype(np.uint32)
+
+
+class Deduplicator:
+    """Corpus-wide LSH index of chunk signatures keyed by chunk ID."""
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = MINHASH_PERMUTATIONS,
+                 bands: int = LSH_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, Tuple[np.ndarray, frozenset]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"chunks": 0, "duplicates": 0, "embedding_tokens_saved": 0, "text_bytes_saved": 0}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _find(self, signature: np.ndarray, numbers: frozenset) -> Optional[str]:
+        """Return the ID of the most similar indexed chunk above the threshold."""
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        best, best_similarity = None, self.threshold
+        for candidate in candidates:
+            other, other_numbers = self._signatures[candidate]
+            if other_numbers != numbers:
+                continue
+            similarity = float(np.mean(other == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
+
+    def dedupe(self, ids: List[str], texts: List[str]) -> Dict[int, str]:
+        """Index new chunks and map the position of each near-duplicate to its canonical ID.
+
+        Canonical IDs may be earlier chunks of the same batch or chunks
+        indexed by previous calls.
+        """
+        signatures = [(self.hasher.signature(text), figures(text)) for text in texts]
+        duplicates = {}
+        with self._lock:
+            for i, (chunk_id, text, (signature, numbers)) in enumerate(zip(ids, texts, signatures)):
+                self.stats["chunks"] += 1
+                canonical = self._find(signature, numbers)
+                if canonical is not None:
+                    duplicates[i] = canonical
+                    self.stats["duplicates"] += 1
+                    self.stats["embedding_tokens_saved"] += estimate_tokens(text)
+                    self.stats["text_bytes_saved"] += len(text.encode("utf-8"))
+                    continue
+                self._signatures[chunk_id] = (signature, numbers)
+                for band, key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(key, []).append(chunk_id)
+        return duplicates
+
+    def remove(self, ids: List[str]):
+        """Forget chunks, e.g. after their document is deleted or their insert failed."""
+        with self._lock:
+            for chunk_id in ids:
+                entry = self._signatures.pop(chunk_id, None)
+                if entry is None:
+                    continue
+                for band, key in enumerate(self._band_keys(entry[0])):
+                    bucket = self._buckets[band].get(key)
+                    if bucket is not None:
+                        bucket.remove(chunk_id)
+                        if not bucket:
+                            del self._buckets[band][key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets = [{} for _ in range(self.bands)]
+            self._signatures.clear()
+
+
+def merge_source(metadata: Dict, source: Optional[str]) -> Dict:
+    """Record another source of a deduplicated chunk in its (scalar-only) metadata."""
+    merged = dict(metadata)
+    sources = [s for s in (merged.get("sources") or merged.get("source") or "").split("|") if s]
+    if source and source not in sources:
+        sources.append(source)
+    if sources:
+        merged["sources"] = "|".join(sources)
+    merged["duplicates"] = merged.get("duplicates", 0) + 1
+    return merged
@@ -0,0 +1,121 @@
+"""
+Compact store for parent chunks in hierarchical retrieval.
+
+Parent texts are never embedded; they are fetched by ID when a child
+sentence matches. Texts are kept UTF-8 encoded in one growing buffer with
+an (offset, length) entry per parent rather than as one str object each, so
+a stray non-Latin-1 character (a curly quote or em dash) does not widen a
+whole parent to two or four bytes per character.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.conversation import estimate_tokens
+
+logger = logging.getLogger('rag')
+
+
+class DocStore:
+    """Parent chunk texts and metadata addressed by parent ID."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._garbage = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, parent_id: str) -> bool:
+        return parent_id in self._index
+
+    def add(self, ids: List[str], texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Store parent texts; re-adding an ID replaces it."""
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            for parent_id, text, metadata in zip(ids, texts, metadatas):
+                if parent_id in self._index:
+                    self._garbage += self._index[parent_id][1]
+                encoded = text.encode("utf-8")
+                self._index[parent_id] = (len(self._buffer), len(encoded))
+                self._buffer += encoded
+                self._metadata[parent_id] = metadata
+
+    def get(self, parent_id: str) -> Optional[str]:
+        """Return a parent's text, or None if unknown."""
+        entry = self._index.get(parent_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._buffer[offset:offset + length].decode("utf-8")
+
+    def get_metadata(self, parent_id: str) -> Optional[Dict[str, Any]]:
+        return self._metadata.get(parent_id)
+
+    def delete(self, ids: Optional[List[str]] = None):
+        """Remove parents by ID, or everything when no IDs are given."""
+        with self._lock:
+            if ids is None:
+                self._buffer = bytearray()
+                self._index.clear()
+                self._metadata.clear()
+                self._garbage = 0
+                return
+            for parent_id in ids:
+                entry = self._index.pop(parent_id, None)
+                self._metadata.pop(parent_id, None)
+                if entry is not None:
+                    self._garbage += entry[1]
+            # Rewrite the buffer once more than half of it is dead text
+            if self._garbage > len(self._buffer) // 2:
+                self._compact()
+
+    def _compact(self):
+        buffer = bytearray()
+        for parent_id, (offset, length) in self._index.items():
+            self._index[parent_id] = (len(buffer), length)
+            buffer += self._buffer[offset:offset + length]
+        logger.debug(f"Docstore compacted from {len(self._buffer)} to {len(buffer)} bytes")
+        self._buffer = buffer
+        self._garbage = 0
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held for texts and index entries."""
+        return {"text_bytes": len(self._buffer), "garbage_bytes": self._garbage, "parents": len(self._index)}
+
+
+def expand_to_parents(results: Dict[str, List[List[Any]]], docstore: DocStore, k: int,
+                      token_budget: int) -> List[Tuple[float, str, Dict[str, Any]]]:
+    """Replace ranked child hits with their deduplicated parents under a token budget.
+
+    Takes a Chroma-layout query result for one query and returns up to k
+    (distance, text, metadata) hits in rank order, each scored by its best
+    child. A hit whose parent is unknown or would overflow the budget falls
+    back to the child text itself.
+    """
+    hits = []
+    seen = set()
+    used = 0
+    rows = zip(results["ids"][0], results["distances"][0], results["documents"][0], results["metadatas"][0])
+    for child_id, distance, document, metadata in rows:
+        if len(hits) >= k:
+            break
+        metadata = metadata or {}
+        parent_id = metadata.get("parent_id")
+        key = parent_id or child_id
+        if key in seen:
+            continue
+        parent = docstore.get(parent_id) if parent_id else None
+        candidates = [(parent, docstore.get_metadata(parent_id))] if parent is not None else []
+        candidates.append((document, metadata))
+        for text, text_metadata in candidates:
+            tokens = estimate_tokens(text)
+            if used + tokens <= token_budget:
+                hits.append((distance, text, text_metadata))
+                used += tokens
+                seen.add(key)
+                break
+    return hits
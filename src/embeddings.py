@@ -0,0 +1,211 @@
+"""
+Embedding providers: Azure OpenAI, or a local ONNX model on the CPU.
+
+The local provider runs a sentence-transformers style ONNX export
+(model.onnx plus a Hugging Face tokenizer.json in one directory). Concurrent
+requests are gathered by a micro-batcher for a few milliseconds and run as
+one padded batch on a single inference thread, whose ONNX Runtime thread
+pool is capped at EMBEDDING_THREADS so embedding never takes every core
+from the web server.
+"""
+import base64
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import (
+    EMBEDDING_PROVIDER,
+    LOCAL_EMBEDDING_MODEL,
+    EMBEDDING_THREADS,
+    EMBEDDING_MAX_BATCH,
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_MAX_LENGTH
+)
+
+logger = logging.getLogger('rag')
+
+
+class EmbeddingProvider:
+    """Interface for turning texts into float32 embedding vectors."""
+
+    name = "base"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a (len(texts), dim) float32 array."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release threads, sessions or connections held by the provider."""
+
+
+class AzureEmbeddingProvider(EmbeddingProvider):
+    """Embeds through an Azure OpenAI embedding deployment."""
+
+    name = "azure"
+
+    def __init__(self, client, deployment_name: str):
+        self.client = client
+        self.deployment_name = deployment_name
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        # Request base64 so vectors are decoded straight into float32
+        # arrays instead of materializing lists of Python floats.
+        response = self.client.embeddings.create(
+            input=texts,
+            model=self.deployment_name,
+            encoding_format="base64"
+        )
+        return np.stack([self.decode_embedding(item.embedding) for item in response.data])
+
+    @staticmethod
+    def decode_embedding(embedding) -> np.ndarray:
+        """Decode a base64 or list embedding into a float32 vector."""
+        if isinstance(embedding, str):
+            return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+        return np.asarray(embedding, dtype=np.float32)
+
+
+class MicroBatcher:
+    """Gathers concurrent requests for up to max_wait_ms and runs them as one batch."""
+
+    def __init__(self, run_batch: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = EMBEDDING_MAX_BATCH,
+                 max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the future resolves to their vectors."""
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _collect(self, first: Tuple[List[str], Future]) -> Tuple[List[Tuple[List[str], Future]], bool]:
+        """Take requests until the batch is full or the wait expires; report a shutdown."""
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Past the deadline, still take requests that are already waiting
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            size += len(item[0])
+        return batch, False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch, closing = self._collect(item)
+            texts = [text for request, _ in batch for text in request]
+            self.batches += 1
+            try:
+                vectors = self.run_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                offset = 0
+                for request, future in batch:
+                    future.set_result(vectors[offset:offset + len(request)])
+                    offset += len(request)
+            if closing:
+                return
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """Embeds locally with an ONNX Runtime session behind a micro-batcher."""
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str = LOCAL_EMBEDDING_MODEL, threads: int = EMBEDDING_THREADS,
+                 max_batch_size: int = EMBEDDING_MAX_BATCH,
+                 max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+                 max_length: int = EMBEDDING_MAX_LENGTH):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embedding provider requires onnxruntime and tokenizers") from e
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+        self.max_batch_size = max_batch_size
+        self.batcher = MicroBatcher(self._run_model, max_batch_size, max_wait_ms)
+        logger.info(f"Local ONNX embedder loaded from {model_dir} with {threads} threads")
+
+    def _run_model(self, texts: List[str]) -> np.ndarray:
+        """Tokenize and run the model in length-sorted slices to minimize padding."""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(order), self.max_batch_size):
+            indices = order[start:start + self.max_batch_size]
+            for index, vector in zip(indices, self._forward([texts[i] for i in indices])):
+                vectors[index] = vector
+        return np.stack(vectors)
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        output = self.session.run(None, {k: v for k, v in feed.items() if k in self._input_names})[0]
+
+        if output.ndim == 3:
+            # Mean-pool token states over the attention mask
+            mask = attention_mask[..., None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return (output / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.batcher.submit(texts).result()
+
+    def close(self):
+        self.batcher.close()
+
+
+def get_embedding_provider(name: str = EMBEDDING_PROVIDER, client=None,
+                           deployment_name: Optional[str] = None) -> EmbeddingProvider:
+    """Create the configured provider; "azure" needs the OpenAI client and deployment."""
+    if name == "azure":
+        return AzureEmbeddingProvider(client, deployment_name)
+    if name == "onnx":
+        return OnnxEmbeddingProvider()
+    raise ValueError(f"Unknown embedding provider '{name}'; expected 'azure' or 'onnx'")
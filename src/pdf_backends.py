@@ -0,0 +1,175 @@
+"""
+Pluggable PDF text extraction backends with per-page fallback.
+"""
+import logging
+import mmap
+from io import BytesIO
+from typing import Dict, List, Type, Union
+
+import PyPDF2
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Optional fast path
+    pdfium = None
+
+logger = logging.getLogger('pdf')
+
+PDFSource = Union[str, bytes, BytesIO]
+
+
+class PDFBackend:
+    """Interface for a PDF text extraction engine."""
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether the engine's library is installed."""
+        return True
+
+    def open(self, source: PDFSource):
+        """Open a document from a path, bytes or binary stream."""
+        raise NotImplementedError
+
+    def page_count(self, document) -> int:
+        """Return the number of pages in an open document."""
+        raise NotImplementedError
+
+    def extract_page(self, document, index: int) -> str:
+        """Extract the text of a zero-based page index."""
+        raise NotImplementedError
+
+    def close(self, document):
+        """Release resources held by an open document."""
+
+
+class PyPDF2Backend(PDFBackend):
+    """Pure-Python extraction with PyPDF2; always available."""
+
+    name = "pypdf2"
+
+    def open(self, source: PDFSource):
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                # The map stays valid after the file object is closed
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        elif isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+        return PyPDF2.PdfReader(source)
+
+    def page_count(self, document) -> int:
+        return len(document.pages)
+
+    def extract_page(self, document, index: int) -> str:
+        return document.pages[index].extract_text()
+
+
+class PdfiumBackend(PDFBackend):
+    """Native extraction with PDFium via pypdfium2."""
+
+    name = "pypdfium2"
+
+    @classmethod
+    def available(cls) -> bool:
+        return pdfium is not None
+
+    def open(self, source: PDFSource):
+        if isinstance(source, BytesIO):
+            source.seek(0)
+        return pdfium.PdfDocument(source)
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def extract_page(self, document, index: int) -> str:
+        page = document[index]
+        try:
+            text_page = page.get_textpage()
+            try:
+                return text_page.get_text_range().replace("\r\n", "\n")
+            finally:
+                text_page.close()
+        finally:
+            page.close()
+
+    def close(self, document):
+        document.close()
+
+
+BACKENDS: Dict[str, Type[PDFBackend]] = {
+    PdfiumBackend.name: PdfiumBackend,
+    PyPDF2Backend.name: PyPDF2Backend,
+}
+
+
+def get_backends(name: str = "auto") -> List[PDFBackend]:
+    """Resolve a backend name to an ordered chain, ending with the PyPDF2 fallback."""
+    if name == "auto":
+        names = [n for n, cls in BACKENDS.items() if cls.available()]
+    elif name in BACKENDS:
+        if not BACKENDS[name].available():
+            logger.warning(f"PDF backend '{name}' is not installed, falling back to PyPDF2")
+        names = [name, PyPDF2Backend.name]
+    else:
+        raise ValueError(f"Unknown PDF backend: {name}")
+
+    chain = []
+    for backend_name in names:
+        if BACKENDS[backend_name].available() and backend_name not in [b.name for b in chain]:
+            chain.append(BACKENDS[backend_name]())
+    return chain
+
+
+class PageExtractor:
+    """Extracts pages with the first backend, retrying errors or empty text on the rest."""
+
+    def __init__(self, source: PDFSource, backends: List[PDFBackend]):
+        """Open the source with the primary backend; fallbacks open lazily."""
+        self.source = source
+        self.backends = backends
+        self.fallbacks = 0
+        self._documents: Dict[int, object] = {}
+        self._failed = set()
+        self.num_pages = self._page_count()
+
+    def _document(self, position: int):
+        """Return the document opened by the backend at this chain position."""
+        if position not in self._documents:
+            self._documents[position] = self.backends[position].open(self.source)
+        return self._documents[position]
+
+    def _page_count(self) -> int:
+        """Count pages with the first backend that can open the document."""
+        errors = []
+        for position, backend in enumerate(self.backends):
+            try:
+                return backend.page_count(self._document(position))
+            except Exception as e:
+                logger.warning(f"PDF backend '{backend.name}' could not open document: {str(e)}")
+                self._failed.add(position)
+                errors.append(e)
+        raise errors[-1] if errors else ValueError("No PDF backends available")
+
+    def extract(self, index: int) -> str:
+        """Extract one page, falling back per page on errors or empty text."""
+        text = ""
+        for position, backend in enumerate(self.backends):
+            if position in self._failed:
+                continue
+            try:
+                text = backend.extract_page(self._document(position), index) or ""
+            except Exception as e:
+                logger.warning(f"PDF backend '{backend.name}' failed on page {index + 1}: {str(e)}")
+                text = ""
+            if text.strip():
+                if position:
+                    self.fallbacks += 1
+                return text
+        return text
+
+    def close(self):
+        """Close every document opened by the chain."""
+        for position, document in self._documents.items():
+            self.backends[position].close(document)
+        self._documents = {}
@@ -1,27 +1,140 @@
 """
 PDF processing module for extracting and chunking text from PDF documents.
 """
+import bisect
 import logging
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple
-import PyPDF2
 from io import BytesIO
 
-from app.config import MAX_CHUNK_SIZE, OVERLAP_SIZE
+from app.config import (
+    MAX_CHUNK_SIZE,
+    OVERLAP_SIZE,
+    PDF_EXTRACTION_WORKERS,
+    PARALLEL_MIN_PAGES,
+    PDF_BACKEND,
+    EXTRACT_TABLES,
+    HIERARCHICAL_RETRIEVAL,
+    PARENT_CHUNK_SIZE,
+    CHILD_MIN_CHARS,
+    CHILD_MAX_CHARS
+)
+from src.pdf_backends import PageExtractor, get_backends
+from src.table_extractor import TableExtractor
 
 logger = logging.getLogger('pdf')
 
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\"'])")
+
+# Per-process extractor for parallel extraction, opened once by the pool initializer
+_worker_extractor = None
+
+
+def _init_page_worker(pdf_path: str, backend: str):
+    """Open the spilled PDF from its path in a worker process.
+
+    Backends map the file (PyPDF2 via mmap, PDFium natively) instead of
+    receiving a pickled copy of the bytes.
+    """
+    global _worker_extractor
+    _worker_extractor = PageExtractor(pdf_path, get_backends(backend))
+
+
+def _extract_page_range(page_range: Tuple[int, int]) -> List[Tuple[int, str]]:
+    """Extract (page_number, text) pairs for a half-open range of page indexes."""
+    start, end = page_range
+    return [(i + 1, _worker_extractor.extract(i)) for i in range(start, end)]
+
+
+def page_ranges(num_pages: int, parts: int) -> List[Tuple[int, int]]:
+    """Split page indexes into at most `parts` contiguous half-open ranges."""
+    size = max(1, -(-num_pages // max(1, parts)))
+    return [(start, min(start + size, num_pages)) for start in range(0, num_pages, size)]
+
+def sentence_spans(text: str, min_chars: int = CHILD_MIN_CHARS,
+                   max_chars: int = CHILD_MAX_CHARS) -> List[Tuple[int, int]]:
+    """Group sentences into spans of at least min_chars, splitting any longer than max_chars."""
+    spans = []
+    start = 0
+    for end in [m.start() for m in SENTENCE_END.finditer(text)] + [len(text)]:
+        if end - start >= min_chars or end == len(text):
+            spans.append((start, end))
+            start = end + 1
+    # A short tail reads better attached to the sentences before it
+    if len(spans) > 1 and spans[-1][1] - spans[-1][0] < min_chars:
+        spans[-2:] = [(spans[-2][0], spans[-1][1])]
+    
+    bounded = []
+    for start, end in spans:
+        while end - start > max_chars:
+            cut = text.rfind(" ", start, start + max_chars)
+            cut = cut if cut > start else start + max_chars
+            bounded.append((start, cut))
+            start = cut + 1
+        if end > start:
+            bounded.append((start, end))
+    return bounded
+
+
 class PDFProcessor:
     """Handles PDF document processing and text chunking."""
     
+    @staticmethod
+    def extract_pages(pdf_file: BytesIO, workers: int = PDF_EXTRACTION_WORKERS,
+                      backend: str = PDF_BACKEND) -> List[Tuple[int, str]]:
+        """Extract (page_number, text) pairs from a PDF, in page order."""
+        try:
+            extractor = PageExtractor(pdf_file, get_backends(backend))
+            try:
+                num_pages = extractor.num_pages
+                workers = min(workers, num_pages)
+                
+                if workers <= 1 or num_pages < PARALLEL_MIN_PAGES:
+                    pages = [(i + 1, extractor.extract(i)) for i in range(num_pages)]
+                    if extractor.fallbacks:
+                        logger.info(f"{extractor.fallbacks} page(s) used the fallback PDF backend")
+                else:
+                    pages = PDFProcessor._extract_pages_parallel(pdf_file, num_pages, workers, backend)
+            finally:
+                extractor.close()
+            
+            backend_name = extractor.backends[0].name if extractor.backends else "none"
+            logger.info(f"Extracted {num_pages} pages from PDF with {backend_name} "
+                        f"using {max(workers, 1)} worker(s)")
+            return pages
+            
+        except Exception as e:
+            logger.error(f"Error extracting pages from PDF: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _extract_pages_parallel(pdf_file: BytesIO, num_pages: int, workers: int,
+                                backend: str) -> List[Tuple[int, str]]:
+        """Extract page ranges in worker processes sharing one on-disk copy of the PDF."""
+        # Spill once to a temp file that every worker maps, rather than
+        # pickling the document bytes into each task.
+        pdf_file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            shutil.copyfileobj(pdf_file, tmp)
+        try:
+            # Several ranges per worker so uneven pages balance out
+            ranges = page_ranges(num_pages, workers * 4)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                                     initargs=(tmp.name, backend)) as pool:
+                return [page for batch in pool.map(_extract_page_range, ranges) for page in batch]
+        finally:
+            os.remove(tmp.name)
+    
     @staticmethod
     def extract_text(pdf_file: BytesIO) -> str:
         """Extract text content from a PDF file."""
         try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            pages = PDFProcessor.extract_pages(pdf_file)
+            text = "".join(page_text + "\n" for _, page_text in pages)
             
             logger.info(f"Successfully extracted text from PDF ({len(text)} characters)")
             return text
@@ -62,8 +175,12 @@ class PDFProcessor:
                     }
                     chunks.append((chunk_text, metadata))
                 
-                # Move the start position, accounting for overlap
-                start = end - overlap if end < len(text) else len(text)
+                # Move the start position, accounting for overlap; a break point
+                # closer than the overlap must not stall or move backwards
+                if end >= len(text):
+                    start = len(text)
+                else:
+                    start = end - overlap if end - overlap > start else end
             
             logger.info(f"Created {len(chunks)} chunks from text")
             return chunks
@@ -72,40 +189,109 @@ class PDFProcessor:
             logger.error(f"Error creating chunks: {str(e)}")
             raise
     
+    @staticmethod
+    def create_hierarchical_chunks(text: str, parent_size: int = PARENT_CHUNK_SIZE) -> List[Tuple[str, dict]]:
+        """Split text into parent sections and the sentence-level child chunks that link to them.
+        
+        Parents are tagged chunk_type "parent"; children are ordinary "prose"
+        chunks. Both carry the parent_index they belong to.
+        """
+        chunks = []
+        for parent_index, (parent_text, parent_meta) in enumerate(
+                PDFProcessor.create_chunks(text, parent_size, overlap=0)):
+            # create_chunks strips whitespace, so locate the text within its span
+            base = text.find(parent_text, parent_meta["start_char"])
+            parent_meta.update(start_char=base, end_char=base + len(parent_text),
+                               chunk_type="parent", parent_index=parent_index)
+            chunks.append((parent_text, parent_meta))
+            for start, end in sentence_spans(parent_text):
+                child = parent_text[start:end]
+                chunks.append((child, {
+                    "start_char": base + start,
+                    "end_char": base + end,
+                    "chunk_size": len(child),
+                    "chunk_type": "prose",
+                    "parent_index": parent_index
+                }))
+        return chunks
+    
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean and normalize extracted text."""
         try:
+            # Remove special characters that might cause issues
+            text = text.replace('\x00', ' ')
+            
             # Remove extra whitespace
             text = ' '.join(text.split())
             
-            # Remove special characters that might cause issues
-            text = text.replace('\x00', '')
-            
             # Normalize newlines
             text = text.replace('\r\n', '\n')
             
-            logger.info("Text cleaned successfully")
+            logger.debug("Text cleaned successfully")
             return text
             
         except Exception as e:
             logger.error(f"Error cleaning text: {str(e)}")
             raise
     
-    def process_pdf(self, pdf_file: BytesIO) -> List[Tuple[str, dict]]:
-        """Process PDF file and return chunks with metadata."""
+    @staticmethod
+    def add_page_metadata(chunks: List[Tuple[str, dict]], page_offsets: List[Tuple[int, int]]):
+        """Annotate chunks with the first and last page their character span covers."""
+        starts = [offset for offset, _ in page_offsets]
+        for _, metadata in chunks:
+            first = bisect.bisect_right(starts, metadata["start_char"]) - 1
+            last = bisect.bisect_right(starts, max(metadata["end_char"] - 1, 0)) - 1
+            metadata["page"] = page_offsets[max(first, 0)][1]
+            metadata["page_end"] = page_offsets[max(last, 0)][1]
+    
+    def process_pdf(self, pdf_file: BytesIO, extract_tables: bool = EXTRACT_TABLES,
+                    hierarchical: bool = HIERARCHICAL_RETRIEVAL) -> List[Tuple[str, dict]]:
+        """Process PDF file and return chunks with metadata.
+        
+        Prose chunks are tagged chunk_type "prose"; when extract_tables is set,
+        detected tables are returned as separate chunk_type "table" chunks.
+        When hierarchical is set, prose chunks are sentence-level children of
+        chunk_type "parent" sections (see create_hierarchical_chunks).
+        """
         try:
-            # Extract text from PDF
-            raw_text = self.extract_text(pdf_file)
+            # Extract text from PDF, page by page
+            pages = self.extract_pages(pdf_file)
             
-            # Clean the extracted text
-            cleaned_text = self.clean_text(raw_text)
+            # Pull tables out before whitespace is flattened
+            table_chunks = []
+            if extract_tables:
+                page_stream = TableExtractor().iter_pages(pages)
+            else:
+                page_stream = ((number, text, []) for number, text in pages)
+            
+            # Clean each page and remember where it starts in the joined text
+            cleaned_pages = []
+            page_offsets = []
+            offset = 0
+            for page_number, page_text, page_tables in page_stream:
+                table_chunks.extend(page_tables)
+                cleaned = self.clean_text(page_text)
+                if not cleaned:
+                    continue
+                page_offsets.append((offset, page_number))
+                cleaned_pages.append(cleaned)
+                offset += len(cleaned) + 1
+            cleaned_text = " ".join(cleaned_pages)
             
             # Create chunks
-            chunks = self.create_chunks(cleaned_text)
+            if hierarchical:
+                chunks = self.create_hierarchical_chunks(cleaned_text)
+            else:
+                chunks = self.create_chunks(cleaned_text)
+                for _, metadata in chunks:
+                    metadata["chunk_type"] = "prose"
+            if page_offsets:
+                self.add_page_metadata(chunks, page_offsets)
             
-            logger.info(f"PDF processed successfully: {len(chunks)} chunks created")
-            return chunks
+            logger.info(f"PDF processed successfully: {len(chunks)} prose and "
+                        f"{len(table_chunks)} table chunks created")
+            return chunks + table_chunks
             
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
@@ -3,9 +3,11 @@ RAG (Retrieval Augmented Generation) engine for the CRE Chatbot.
 """
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import uuid
+from typing import List, Dict, Any, Iterator, Optional
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from openai import AzureOpenAI
 from app.config import (
@@ -13,15 +15,33 @@ from app.config import (
     AZURE_OPENAI_API_KEY,  # Added this line
     TEMPERATURE,
     MAX_TOKENS,
-    AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME
+    AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME,
+    EMBEDDING_PROVIDER,
+    EMBEDDING_QUANTIZATION,
+    RESCORE_FACTOR,
+    HISTORY_TOKEN_BUDGET,
+    REWRITE_MAX_TOKENS,
+    TABLE_K,
+    DEDUP_CHUNKS,
+    PARENT_TOKEN_BUDGET,
+    CHILD_CANDIDATES
 )
+from src.conversation import ConversationHistory, estimate_tokens
+from src.dedup import Deduplicator, merge_source
+from src.docstore import DocStore, expand_to_parents
+from src.embeddings import get_embedding_provider
+from src.table_extractor import is_numeric_question
+from src.vector_store import VectorStore
 
 logger = logging.getLogger('rag')
 
+SYSTEM_PROMPT = "You are a helpful assistant that answers questions about commercial real estate concepts. Use the provided context to answer questions accurately and concisely."
+REWRITE_PROMPT = "Rewrite the user's follow-up question as a standalone search query about commercial real estate, resolving pronouns and references from the conversation. Reply with the query only."
+
 class RAGEngine:
     """Handles document retrieval and question answering using Azure OpenAI."""
     
-    def __init__(self, deployment_name: str):
+    def __init__(self, deployment_name: str, quantization: str = EMBEDDING_QUANTIZATION):
         """Initialize the RAG engine with Azure OpenAI client."""
         self.client = AzureOpenAI(
             api_key=AZURE_OPENAI_API_KEY,
@@ -30,102 +50,327 @@ class RAGEngine:
         )
         self.deployment_name = deployment_name
         self.embedding_deployment_name = AZURE_OPENAI_EMBEDDING_DEPLOYMENT_NAME
+        self.quantization = quantization
+        self.embedder = get_embedding_provider(
+            EMBEDDING_PROVIDER,
+            client=self.client,
+            deployment_name=self.embedding_deployment_name
+        )
         
         # Initialize ChromaDB with simple in-memory settings
         self.chroma_client = chromadb.Client(Settings(anonymized_telemetry=False))
         self.collection = None
+        self.table_collection = None
+        # Parent sections for hierarchical retrieval; only their children are embedded
+        self.docstore = DocStore()
+        # Corpus-wide near-duplicate index, so repeated boilerplate is embedded once
+        self.deduplicator = Deduplicator() if DEDUP_CHUNKS else None
+        self._embedding_dim = None
         self.initialize_vector_store("cre_docs")
         logger.info("RAG Engine initialized with Azure OpenAI")
     
-    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings for the given texts using Azure OpenAI."""
+    def create_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Create embeddings for the given texts with the configured provider."""
         try:
-            response = self.client.embeddings.create(
-                input=texts,
-                model=self.embedding_deployment_name
-            )
-            return [item.embedding for item in response.data]
+            return self.embedder.embed(texts)
         except Exception as e:
             logger.error(f"Error creating embeddings: {str(e)}")
             raise
     
+    def _create_collection(self, name: str):
+        """Create a Chroma collection, or a NumPy store when quantization is enabled."""
+        if self.quantization == "none":
+            return self.chroma_client.get_or_create_collection(
+                name=name,
+                metadata={"hnsw:space": "cosine"}
+            )
+        return VectorStore(
+            name=name,
+            quantization=self.quantization,
+            rescore_factor=RESCORE_FACTOR
+        )
+    
     def initialize_vector_store(self, collection_name: str):
         """Initialize or get the vector store collection."""
         try:
-            self.collection = self.chroma_client.get_or_create_collection(
-                name=collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
+            self.collection = self._create_collection(collection_name)
+            # Tables are indexed apart from prose so row chunks don't crowd out passages
+            self.table_collection = self._create_collection(f"{collection_name}_tables")
             logger.info(f"Vector store initialized with collection: {collection_name}")
         except Exception as e:
             logger.error(f"Error initializing vector store: {str(e)}")
             raise
     
-    def add_documents(self, texts: List[str], metadata: Optional[List[Dict[str, Any]]] = None):
-        """Add documents to the vector store."""
+    def add_documents(self, texts: List[str], metadata: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+        """Add documents to the vector store and report what was stored.
+        
+        chunk_type "table" chunks go to the table index. chunk_type "parent"
+        chunks go to the docstore unembedded, and chunks carrying their
+        parent_index are linked to them, so parents and children must be
+        added in the same call. Near-duplicates of chunks already indexed
+        (or earlier in the batch) are not embedded; their source is added
+        to the kept chunk's "sources" metadata instead.
+        """
         try:
             if not self.collection:
                 raise ValueError("Vector store collection not initialized")
-                
-            embeddings = self.create_embeddings(texts)
-            # Use timestamp + index as ID to ensure uniqueness
+            
+            metadata = list(metadata) if metadata else [{} for _ in texts]
+            report = {"chunks": len(texts), "added": 0, "duplicates": 0, "parents": 0,
+                      "embedding_tokens_saved": 0, "index_bytes_saved": 0}
+            # Use timestamp + batch nonce + index as ID so concurrent batches don't collide
             import time
             timestamp = int(time.time())
-            ids = [f"{timestamp}_{i}" for i in range(len(texts))]
+            batch = uuid.uuid4().hex[:8]
             
-            self.collection.add(
-                embeddings=embeddings,
-                documents=texts,
-                ids=ids,
-                metadatas=metadata if metadata else [{}] * len(texts)
-            )
-            logger.info(f"Added {len(texts)} documents to vector store")
+            # Store parents apart and point children at their batch-unique IDs
+            parents = [i for i, m in enumerate(metadata) if m.get("chunk_type") == "parent"]
+            if parents:
+                parent_ids = {metadata[i]["parent_index"]: f"{timestamp}_{batch}_parent_{metadata[i]['parent_index']}"
+                              for i in parents}
+                self.docstore.add(
+                    ids=[parent_ids[metadata[i]["parent_index"]] for i in parents],
+                    texts=[texts[i] for i in parents],
+                    metadatas=[metadata[i] for i in parents]
+                )
+                report["parents"] = len(parents)
+                rows = [i for i, m in enumerate(metadata) if m.get("chunk_type") != "parent"]
+                texts = [texts[i] for i in rows]
+                metadata = [dict(metadata[i]) for i in rows]
+                for m in metadata:
+                    if "parent_index" in m:
+                        m["parent_id"] = parent_ids[m.pop("parent_index")]
+            
+            ids = [f"{timestamp}_{batch}_{i}" for i in range(len(texts))]
+            
+            # Keep one copy of near-duplicates, recording every source on it
+            duplicates = self.deduplicator.dedupe(ids, texts) if self.deduplicator is not None else {}
+            positions = {chunk_id: i for i, chunk_id in enumerate(ids)}
+            existing_sources: Dict[str, List[str]] = {}
+            for i, canonical in duplicates.items():
+                if canonical in positions:
+                    j = positions[canonical]
+                    metadata[j] = merge_source(metadata[j], metadata[i].get("source"))
+                else:
+                    existing_sources.setdefault(canonical, []).append(metadata[i].get("source"))
+            if duplicates:
+                report["duplicates"] = len(duplicates)
+                report["embedding_tokens_saved"] = sum(estimate_tokens(texts[i]) for i in duplicates)
+                report["index_bytes_saved"] = sum(len(texts[i].encode("utf-8")) for i in duplicates)
+                keep = [i for i in range(len(texts)) if i not in duplicates]
+                texts = [texts[i] for i in keep]
+                metadata = [metadata[i] for i in keep]
+                ids = [ids[i] for i in keep]
+            
+            if texts:
+                try:
+                    self._add_embedded(ids, texts, metadata)
+                except Exception:
+                    if self.deduplicator is not None:
+                        self.deduplicator.remove(ids)
+                    raise
+                report["added"] = len(texts)
+            if existing_sources:
+                self._merge_sources(existing_sources)
+            if duplicates and self._embedding_dim:
+                # Each skipped chunk also saves a float32 vector
+                report["index_bytes_saved"] += len(duplicates) * 4 * self._embedding_dim
+            
+            logger.info(f"Added {report['added']} documents to vector store ({report['duplicates']} "
+                        f"near-duplicates skipped, {report['parents']} parent sections)")
+            return report
         except Exception as e:
             logger.error(f"Error adding documents: {str(e)}")
             raise
     
-    def query(self, question: str, k: int = 3) -> Dict[str, Any]:
-        """Query the vector store and generate an answer."""
+    def _add_embedded(self, ids: List[str], texts: List[str], metadata: List[Dict[str, Any]]):
+        """Embed chunks and add them to the prose or table index."""
+        embeddings = np.asarray(self.create_embeddings(texts), dtype=np.float32)
+        self._embedding_dim = embeddings.shape[-1]
+        
+        is_table = [m.get("chunk_type") == "table" for m in metadata]
+        for collection, wanted in ((self.collection, False), (self.table_collection, True)):
+            rows = [i for i, flag in enumerate(is_table) if flag == wanted]
+            if not rows:
+                continue
+            collection.add(
+                embeddings=self._to_store_format(embeddings[rows], collection),
+                documents=[texts[i] for i in rows],
+                ids=[ids[i] for i in rows],
+                metadatas=[metadata[i] for i in rows]
+            )
+    
+    def _merge_sources(self, sources: Dict[str, List[str]]):
+        """Record new sources on chunks indexed by earlier batches."""
+        for collection in (self.collection, self.table_collection):
+            stored = collection.get(ids=list(sources))
+            if not stored["ids"]:
+                continue
+            updated = []
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+                for source in sources[chunk_id]:
+                    metadata = merge_source(metadata or {}, source)
+                updated.append(metadata)
+            collection.update(ids=stored["ids"], metadatas=updated)
+    
+    @staticmethod
+    def _to_store_format(embeddings, collection):
+        """Chroma only accepts nested lists; the NumPy store takes arrays as-is."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if isinstance(collection, VectorStore):
+            return embeddings
+        return embeddings.tolist()
+    
+    def _retrieve(self, question_embedding, search_query: str, k: int) -> Dict[str, List[Any]]:
+        """Retrieve prose chunks, merging in table chunks for numeric questions.
+        
+        With parent sections in the docstore, matching child sentences are
+        expanded to up to k deduplicated parents within PARENT_TOKEN_BUDGET.
+        """
+        hierarchical = len(self.docstore) > 0
+        results = self.collection.query(
+            query_embeddings=self._to_store_format([question_embedding], self.collection),
+            n_results=k * CHILD_CANDIDATES if hierarchical else k
+        )
+        if hierarchical:
+            scored = [(distance, text) for distance, text, _ in
+                      expand_to_parents(results, self.docstore, k, PARENT_TOKEN_BUDGET)]
+            documents = [text for _, text in scored]
+        else:
+            scored = None
+            documents = results['documents'][0]
+        
+        if (self.table_collection is not None and is_numeric_question(search_query)
+                and self.table_collection.count() > 0):
+            table_results = self.table_collection.query(
+                query_embeddings=self._to_store_format([question_embedding], self.table_collection),
+                n_results=min(TABLE_K, k)
+            )
+            # Both indexes use cosine distance, so hits merge on one scale
+            if scored is None:
+                scored = list(zip(results['distances'][0], documents))
+            scored += list(zip(table_results['distances'][0], table_results['documents'][0]))
+            scored.sort(key=lambda hit: hit[0])
+            documents = [document for _, document in scored[:k]]
+        
+        return {"documents": documents}
+    
+    def rewrite_query(self, question: str, history: Optional[ConversationHistory]) -> str:
+        """Rewrite a follow-up question into a standalone search query."""
+        if not history or len(history) == 0:
+            return question
+        
+        cached = history.cached_rewrite(question)
+        if cached is not None:
+            return cached
+        
         try:
-            # Create embedding for the question
-            question_embedding = self.create_embeddings([question])[0]
-            
-            # Query vector store
-            results = self.collection.query(
-                query_embeddings=[question_embedding],
-                n_results=k
+            transcript = "\n".join(
+                f"{m['role']}: {m['content']}" for m in history.window(HISTORY_TOKEN_BUDGET)
             )
-            
-            # Prepare context from retrieved documents
-            context = "\n".join(results['documents'][0])
+            response = self.client.chat.completions.create(
+                model=self.deployment_name,
+                messages=[
+                    {"role": "system", "content": REWRITE_PROMPT},
+                    {"role": "user", "content": f"Conversation:\n{transcript}\n\nFollow-up question: {question}"}
+                ],
+                temperature=0,
+                max_tokens=REWRITE_MAX_TOKENS
+            )
+            rewritten = (response.choices[0].message.content or "").strip() or question
+        except Exception as e:
+            # Retrieval still works on the raw question, so don't fail the query
+            logger.warning(f"Query rewrite failed, using original question: {str(e)}")
+            rewritten = question
+        
+        history.store_rewrite(question, rewritten)
+        logger.info(f"Rewrote follow-up question to: {rewritten}")
+        return rewritten
+    
+    def _prepare_answer(self, question: str, k: int,
+                        history: Optional[ConversationHistory]) -> Dict[str, Any]:
+        """Rewrite, retrieve and build the chat messages for a question."""
+        # Resolve follow-ups against the conversation before retrieval
+        search_query = self.rewrite_query(question, history)
+        
+        # Create embedding for the question
+        question_embedding = self.create_embeddings([search_query])[0]
+        
+        # Query vector store
+        results = self._retrieve(question_embedding, search_query, k)
+        
+        # Prepare context from retrieved documents
+        context = "\n".join(results['documents'])
+        
+        # Bound the history sent to the model by the token budget
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if history:
+            messages.extend(history.window(HISTORY_TOKEN_BUDGET))
+        messages.append({"role": "user", "content": f"Context: {context}\n\nQuestion: {question}"})
+        
+        return {
+            "messages": messages,
+            "context": context,
+            "source_documents": results['documents'],
+            "search_query": search_query
+        }
+    
+    def query(self, question: str, k: int = 3,
+              history: Optional[ConversationHistory] = None) -> Dict[str, Any]:
+        """Query the vector store and generate an answer."""
+        try:
+            prepared = self._prepare_answer(question, k, history)
             
             # Generate answer using Azure OpenAI
-            messages = [
-                {"role": "system", "content": "You are a helpful assistant that answers questions about commercial real estate concepts. Use the provided context to answer questions accurately and concisely."},
-                {"role": "user", "content": f"Context: {context}\n\nQuestion: {question}"}
-            ]
-            
             response = self.client.chat.completions.create(
                 model=self.deployment_name,
-                messages=messages,
+                messages=prepared.pop("messages"),
                 temperature=TEMPERATURE,
                 max_tokens=MAX_TOKENS
             )
             
             answer = response.choices[0].message.content
             
-            return {
-                "answer": answer,
-                "context": context,
-                "source_documents": results['documents'][0]
-            }
+            return {"answer": answer, **prepared}
             
         except Exception as e:
             logger.error(f"Error querying RAG engine: {str(e)}")
             raise
     
+    def stream_query(self, question: str, k: int = 3,
+                     history: Optional[ConversationHistory] = None) -> Dict[str, Any]:
+        """Retrieve context now and return the answer as a stream of text deltas."""
+        try:
+            prepared = self._prepare_answer(question, k, history)
+            messages = prepared.pop("messages")
+        except Exception as e:
+            logger.error(f"Error querying RAG engine: {str(e)}")
+            raise
+        
+        def answer_stream() -> Iterator[str]:
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=messages,
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_TOKENS,
+                    stream=True
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except Exception as e:
+                logger.error(f"Error streaming answer: {str(e)}")
+                raise
+        
+        return {"answer_stream": answer_stream(), **prepared}
+    
     def clear(self):
         """Clear the vector store collection."""
-        if self.collection:
-            self.collection.delete()
-            logger.info("Vector store collection cleared")
+        for collection in (self.collection, self.table_collection):
+            if collection:
+                collection.delete()
+        self.docstore.delete()
+        if self.deduplicator is not None:
+            self.deduplicator.clear()
+        logger.info("Vector store collection cleared")
@@ -0,0 +1,209 @@
+"""
+Table detection and extraction for rent rolls, operating statements and schedules.
+
+Tables are detected from the line structure of extracted page text, before
+whitespace is flattened, and emitted as compact pipe-delimited row chunks
+with the header repeated in every chunk. Pages are processed as a stream:
+only the rows of the table currently being assembled are held in memory.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.config import TABLE_CHUNK_ROWS, MIN_TABLE_ROWS
+
+logger = logging.getLogger('pdf')
+
+NUMERIC_TOKEN = re.compile(
+    r"^[(\-$]*\$?\d[\d,]*(\.\d+)?%?\)?$"  # 1,250  $28.40  (150,000)  6.25%
+    r"|^\d{1,2}/\d{1,2}/\d{2,4}$"        # 01/01/2021
+)
+COLUMN_GAP = re.compile(r"\t| {2,}")
+NUMERIC_QUESTION = re.compile(
+    r"\d|\$|%|\b(how (much|many)|total|amount|rents?|noi|income|expenses?|sf|square feet|psf"
+    r"|balance|payments?|schedule|occupancy|vacancy|rate)\b",
+    re.IGNORECASE
+)
+# Rows whose text part is longer than this read as prose, not a label column
+MAX_LABEL_WORDS = 6
+
+
+def is_numeric(token: str) -> bool:
+    """Return whether a token looks like an amount, count, percentage or date."""
+    return bool(NUMERIC_TOKEN.match(token))
+
+
+def is_numeric_question(question: str) -> bool:
+    """Return whether a question is likely answered from figures in a table."""
+    return bool(NUMERIC_QUESTION.search(question))
+
+
+def is_table_row(line: str) -> bool:
+    """Heuristically decide whether a line is a row of a numeric table."""
+    tokens = line.split()
+    if len(tokens) < 2:
+        return False
+    numeric = sum(1 for t in tokens if is_numeric(t))
+    if numeric == 0:
+        return False
+    if numeric / len(tokens) >= 0.3:
+        return True
+    # Label followed by an amount, e.g. "Net Operating Income $1,250,000"
+    return is_numeric(tokens[-1]) and len(tokens) - numeric <= MAX_LABEL_WORDS
+
+
+def split_cells(line: str) -> List[str]:
+    """Split a row into cells on column gaps, else group runs of text between numbers."""
+    line = line.strip()
+    if COLUMN_GAP.search(line):
+        return [cell for cell in COLUMN_GAP.split(line) if cell]
+    cells: List[str] = []
+    words: List[str] = []
+    for token in line.split():
+        if is_numeric(token):
+            if words:
+                cells.append(" ".join(words))
+                words = []
+            cells.append(token)
+        else:
+            words.append(token)
+    if words:
+        cells.append(" ".join(words))
+    return cells
+
+
+@dataclass
+class _PendingTable:
+    """Rows of the table currently being assembled."""
+    table_id: int
+    header: Optional[str]
+    title: Optional[str]
+    columns: int
+    rows: List[Tuple[int, str]] = field(default_factory=list)
+    emitted_rows: int = 0
+
+
+class TableExtractor:
+    """Splits page text into prose and compact, header-repeating table chunks."""
+
+    def __init__(self, chunk_rows: int = TABLE_CHUNK_ROWS, min_rows: int = MIN_TABLE_ROWS):
+        """Configure rows per emitted chunk and the minimum rows that make a table."""
+        self.chunk_rows = chunk_rows
+        self.min_rows = min_rows
+        self._pending: Optional[_PendingTable] = None
+        self._next_table_id = 0
+
+    @staticmethod
+    def format_row(cells: List[str]) -> str:
+        """Render cells as a compact pipe-delimited row."""
+        return " | ".join(cell.strip() for cell in cells)
+
+    def _find_tables(self, lines: List[str]) -> List[Tuple[int, int]]:
+        """Return half-open line ranges of runs of table rows."""
+        runs = []
+        start = None
+        for i, line in enumerate(lines + [""]):
+            if i < len(lines) and is_table_row(line):
+                if start is None:
+                    start = i
+            elif start is not None:
+                if i - start >= self.min_rows:
+                    runs.append((start, i))
+                start = None
+        return runs
+
+    def _header(self, lines: List[str], start: int, columns: int) -> Tuple[Optional[str], Optional[str], int]:
+        """Find the header (and a title above it) preceding a run; return the first consumed line."""
+        header = title = None
+        first = start
+        if start > 0 and lines[start - 1].strip() and not is_table_row(lines[start - 1]):
+            header_cells = split_cells(lines[start - 1])
+            header = (self.format_row(header_cells) if len(header_cells) == columns
+                      else " ".join(lines[start - 1].split()))
+            first = start - 1
+            above = lines[first - 1].strip() if first > 0 else ""
+            # Short, unpunctuated lines read as captions; sentences do not
+            if above and len(above.split()) <= 12 and not above.endswith("."):
+                title = " ".join(above.split())
+                first -= 1
+        return header, title, first
+
+    def _chunk(self, table: _PendingTable, rows: List[Tuple[int, str]]) -> Tuple[str, dict]:
+        """Build one table chunk with the title and header repeated."""
+        lines = []
+        if table.title:
+            lines.append(f"Table: {table.title}")
+        if table.header:
+            lines.append(table.header)
+        lines.extend(row for _, row in rows)
+        text = "\n".join(lines)
+        metadata = {
+            "chunk_type": "table",
+            "table_id": table.table_id,
+            "row_start": table.emitted_rows,
+            "rows": len(rows),
+            "page": rows[0][0],
+            "page_end": rows[-1][0],
+            "chunk_size": len(text),
+        }
+        table.emitted_rows += len(rows)
+        return text, metadata
+
+    def _drain(self, final: bool) -> List[Tuple[str, dict]]:
+        """Emit full chunks of the pending table, and the remainder when final."""
+        chunks = []
+        table = self._pending
+        if table is None:
+            return chunks
+        while len(table.rows) >= self.chunk_rows or (final and table.rows):
+            batch, table.rows = table.rows[:self.chunk_rows], table.rows[self.chunk_rows:]
+            chunks.append(self._chunk(table, batch))
+        if final:
+            self._pending = None
+        return chunks
+
+    def split_page(self, page_number: int, page_text: str) -> Tuple[str, List[Tuple[str, dict]]]:
+        """Remove table lines from a page, returning its prose and any completed table chunks."""
+        lines = page_text.splitlines()
+        runs = self._find_tables(lines)
+        chunks: List[Tuple[str, dict]] = []
+        consumed = set()
+
+        for run_index, (start, end) in enumerate(runs):
+            rows = [split_cells(line) for line in lines[start:end]]
+            columns = max(len(r) for r in rows)
+            header, title, first = self._header(lines, start, columns)
+            consumed.update(range(first, end))
+
+            # A table at the top of a page with the same header continues the
+            # pending one; a running page header or caption may precede it
+            pending = self._pending
+            lines_above = sum(1 for line in lines[:first] if line.strip())
+            continues = (run_index == 0 and pending is not None and lines_above <= 1
+                         and pending.columns == columns and pending.header == header)
+            if not continues:
+                chunks.extend(self._drain(final=True))
+                self._pending = _PendingTable(self._next_table_id, header, title, columns)
+                self._next_table_id += 1
+            self._pending.rows.extend((page_number, self.format_row(r)) for r in rows)
+            chunks.extend(self._drain(final=False))
+
+        if not runs or any(line.strip() for i, line in enumerate(lines[runs[-1][1]:], runs[-1][1])
+                           if i not in consumed):
+            # Prose after the last table ends it; it cannot continue onto the next page
+            chunks.extend(self._drain(final=True))
+
+        prose = "\n".join(line for i, line in enumerate(lines) if i not in consumed)
+        return prose, chunks
+
+    def iter_pages(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str, List[Tuple[str, dict]]]]:
+        """Stream (page_number, prose, table_chunks) for each page, flushing at the end."""
+        last_page = None
+        for page_number, page_text in pages:
+            prose, chunks = self.split_page(page_number, page_text)
+            last_page = page_number
+            yield page_number, prose, chunks
+        remainder = self._drain(final=True)
+        if remainder:
+            yield last_page, "", remainder
@@ -0,0 +1,299 @@
+"""
+In-memory NumPy vector store with optional scalar quantization.
+
+The store mirrors the subset of the Chroma collection API used by the
+RAG engine (``add``, ``query``, ``get``, ``delete``, ``count``) so it can be
+swapped in for ``RAGEngine.collection``. Vectors are L2-normalized and kept
+in RAM either at full float32 precision or quantized to float16 / int8 with
+per-vector scales. When quantized, the float32 originals are appended to a
+disk-backed file and only the top candidates of the approximate search are
+rescored at full precision.
+"""
+import logging
+import os
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('rag')
+
+QUANTIZATION_MODES = ("none", "float16", "int8")
+
+# Rows scored per block during the approximate search; bounds the float32
+# working copy of quantized codes to BLOCK_ROWS x dim.
+BLOCK_ROWS = 16384
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors row-wise so dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Quantize vectors, returning the codes and per-vector scales (int8 only)."""
+    if mode == "none":
+        return np.asarray(vectors, dtype=np.float32), None
+    if mode == "float16":
+        return np.asarray(vectors, dtype=np.float16), None
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """Reconstruct float32 vectors from quantized codes."""
+    vectors = codes.astype(np.float32)
+    if scales is not None:
+        vectors *= scales[:, None]
+    return vectors
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Check a metadata dict against a Chroma-style equality filter."""
+    if not where:
+        return True
+    for key, expected in where.items():
+        if isinstance(expected, dict) and "$in" in expected:
+            if metadata.get(key) not in expected["$in"]:
+                return False
+        elif metadata.get(key) != expected:
+            return False
+    return True
+
+
+class VectorStore:
+    """Cosine-similarity vector store backed by NumPy arrays."""
+
+    def __init__(self, name: str = "cre_docs", quantization: str = "none",
+                 rescore_factor: int = 4, full_precision_path: Optional[str] = None):
+        """Create an empty store; quantized stores spill float32 originals to disk."""
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        self.name = name
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self.dim: Optional[int] = None
+
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._size = 0
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._id_index: Dict[str, int] = {}
+
+        # Full-precision copies are only needed when the RAM copy is lossy
+        self._full_path = None
+        self._full_view: Optional[np.ndarray] = None
+        if quantization != "none":
+            if full_precision_path is None:
+                fd, full_precision_path = tempfile.mkstemp(prefix=f"{name}_", suffix=".f32")
+                os.close(fd)
+            self._full_path = full_precision_path
+            open(self._full_path, "wb").close()
+
+    def count(self) -> int:
+        """Return the number of stored vectors."""
+        return self._size
+
+    def _ensure_capacity(self, extra: int):
+        """Grow the code (and scale) arrays geometrically to fit extra rows."""
+        needed = self._size + extra
+        capacity = 0 if self._codes is None else self._codes.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        dtype = {"none": np.float32, "float16": np.float16, "int8": np.int8}[self.quantization]
+        codes = np.empty((new_capacity, self.dim), dtype=dtype)
+        if self._codes is not None:
+            codes[:self._size] = self._codes[:self._size]
+        self._codes = codes
+        if self.quantization == "int8":
+            scales = np.empty(new_capacity, dtype=np.float32)
+            if self._scales is not None:
+                scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+
+    def add(self, ids: List[str], embeddings: np.ndarray, documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Add vectors with their ids, documents and metadata."""
+        vectors = normalize(embeddings)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError("Number of ids does not match number of embeddings")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of dimension {self.dim}, got {vectors.shape[1]}")
+        duplicates = [i for i in ids if i in self._id_index]
+        if duplicates:
+            raise ValueError(f"IDs already exist in store: {duplicates[:5]}")
+
+        codes, scales = quantize(vectors, self.quantization)
+        self._ensure_capacity(len(ids))
+        start, end = self._size, self._size + len(ids)
+        self._codes[start:end] = codes
+        if scales is not None:
+            self._scales[start:end] = scales
+        if self._full_path:
+            with open(self._full_path, "ab") as f:
+                f.write(vectors.tobytes())
+            self._full_view = None
+        self._size = end
+
+        for offset, chunk_id in enumerate(ids):
+            self._id_index[chunk_id] = start + offset
+        self.ids.extend(ids)
+        self.documents.extend(documents if documents is not None else [""] * len(ids))
+        self.metadatas.extend(metadatas if metadatas is not None else [{} for _ in ids])
+
+    def _full_precision(self) -> np.ndarray:
+        """Return a read-only memory map of the float32 originals."""
+        if self._full_view is None or self._full_view.shape[0] != self._size:
+            self._full_view = np.memmap(self._full_path, dtype=np.float32, mode="r",
+                                        shape=(self._size, self.dim))
+        return self._full_view
+
+    def _approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """Score all rows against the queries blockwise, returning (rows, queries)."""
+        scores = np.empty((self._size, queries.shape[0]), dtype=np.float32)
+        for start in range(0, self._size, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, self._size)
+            block = self._codes[start:end]
+            if self.quantization == "int8":
+                scores[start:end] = (block.astype(np.float32) @ queries.T) * self._scales[start:end, None]
+            else:
+                scores[start:end] = block.astype(np.float32, copy=False) @ queries.T
+        return scores
+
+    def _filter_mask(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Build a boolean row mask for a metadata filter."""
+        if not where:
+            return None
+        return np.fromiter((matches_where(m, where) for m in self.metadatas),
+                           dtype=bool, count=self._size)
+
+    def query(self, query_embeddings: np.ndarray, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None) -> Dict[str, List[List[Any]]]:
+        """Return the nearest neighbours for each query in Chroma's result layout."""
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        queries = normalize(query_embeddings)
+        if self._size == 0:
+            for _ in range(queries.shape[0]):
+                for key in results:
+                    results[key].append([])
+            return results
+
+        scores = self._approximate_scores(queries)
+        mask = self._filter_mask(where)
+        if mask is not None:
+            scores[~mask] = -np.inf
+        available = self._size if mask is None else int(mask.sum())
+        k = min(n_results, available)
+        rescore = self._full_path is not None
+        n_candidates = min(available, k * self.rescore_factor) if rescore else k
+
+        for q in range(queries.shape[0]):
+            column = scores[:, q]
+            if k == 0:
+                top, top_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            else:
+                candidates = np.argpartition(-column, n_candidates - 1)[:n_candidates]
+                if rescore:
+                    # Sorted indices keep memmap reads sequential
+                    candidates = np.sort(candidates)
+                    candidate_scores = self._full_precision()[candidates] @ queries[q]
+                else:
+                    candidate_scores = column[candidates]
+                order = np.argsort(-candidate_scores)[:k]
+                top, top_scores = candidates[order], candidate_scores[order]
+            results["ids"].append([self.ids[i] for i in top])
+            results["documents"].append([self.documents[i] for i in top])
+            results["metadatas"].append([self.metadatas[i] for i in top])
+            results["distances"].append([float(1.0 - s) for s in top_scores])
+        return results
+
+    def get(self, ids: Optional[List[str]] = None,
+            where: Optional[Dict[str, Any]] = None) -> Dict[str, List[Any]]:
+        """Fetch stored documents by id and/or metadata filter."""
+        if ids is not None:
+            rows = [self._id_index[i] for i in ids if i in self._id_index]
+        else:
+            rows = range(self._size)
+        rows = [r for r in rows if matches_where(self.metadatas[r], where)]
+        return {
+            "ids": [self.ids[r] for r in rows],
+            "documents": [self.documents[r] for r in rows],
+            "metadatas": [self.metadatas[r] for r in rows],
+        }
+
+    def update(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Replace the metadata of existing rows."""
+        for chunk_id, metadata in zip(ids, metadatas):
+            if chunk_id in self._id_index:
+                self.metadatas[self._id_index[chunk_id]] = metadata
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Delete rows by id and/or filter; with no arguments, clear the store."""
+        if ids is None and where is None:
+            self._reset()
+            return
+        doomed = set(self.get(ids=ids, where=where)["ids"])
+        if not doomed:
+            return
+        keep = np.array([i not in doomed for i in self.ids], dtype=bool)
+        self._compact(keep)
+
+    def _reset(self):
+        """Drop all rows while keeping the store configuration."""
+        self._codes = None
+        self._scales = None
+        self._size = 0
+        self.ids, self.documents, self.metadatas = [], [], []
+        self._id_index = {}
+        self._full_view = None
+        if self._full_path:
+            open(self._full_path, "wb").close()
+
+    def _compact(self, keep: np.ndarray):
+        """Rewrite storage keeping only the rows selected by the mask."""
+        rows = np.flatnonzero(keep)
+        codes = self._codes[rows].copy()
+        scales = self._scales[rows].copy() if self._scales is not None else None
+        full = np.array(self._full_precision()[rows]) if self._full_path else None
+        ids = [self.ids[r] for r in rows]
+        documents = [self.documents[r] for r in rows]
+        metadatas = [self.metadatas[r] for r in rows]
+
+        self._reset()
+        self._codes, self._scales, self._size = codes, scales, len(rows)
+        self.ids, self.documents, self.metadatas = ids, documents, metadatas
+        self._id_index = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        if full is not None:
+            with open(self._full_path, "wb") as f:
+                f.write(full.tobytes())
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Report bytes used by vectors in RAM and full-precision copies on disk."""
+        ram = 0
+        if self._codes is not None:
+            ram += self._codes[:self._size].nbytes
+        if self._scales is not None:
+            ram += self._scales[:self._size].nbytes
+        disk = os.path.getsize(self._full_path) if self._full_path else 0
+        return {"vectors_in_memory": ram, "full_precision_on_disk": disk,
+                "bytes_per_vector": ram // self._size if self._size else 0}
+
+    def close(self):
+        """Release the full-precision file."""
+        self._full_view = None
+        if self._full_path and os.path.exists(self._full_path):
+            os.remove(self._full_path)
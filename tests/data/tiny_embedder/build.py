@@ -0,0 +1,58 @@
+"""
+Rebuild the tiny ONNX embedder used by the local embedding tests.
+
+A word-level tokenizer over the synthetic CRE vocabulary feeds a 32-wide
+embedding table; the graph masks padding and outputs last_hidden_state
+like a sentence-transformers export, so the provider's pooling path is
+exercised. Requires the onnx package (build time only).
+
+Usage:
+    python -m tests.data.tiny_embedder.build
+"""
+import os
+import re
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+from tokenizers import Tokenizer, models, normalizers, pre_tokenizers
+
+from benchmarks.corpus import CRE_SENTENCES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DIM = 32
+
+
+def build():
+    words = sorted({w for s in CRE_SENTENCES for w in re.findall(r"\w+", s.lower())})
+    vocab = {"[PAD]": 0, "[UNK]": 1, **{w: i + 2 for i, w in enumerate(words)}}
+
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(os.path.join(HERE, "tokenizer.json"))
+
+    table = np.random.default_rng(0).standard_normal((len(vocab), DIM)).astype(np.float32)
+    table[0] = 0.0
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["table", "input_ids"], ["embedded"]),
+            helper.make_node("Cast", ["attention_mask"], ["mask"], to=TensorProto.FLOAT),
+            helper.make_node("Unsqueeze", ["mask", "axes"], ["mask3"]),
+            helper.make_node("Mul", ["embedded", "mask3"], ["last_hidden_state"]),
+        ],
+        "tiny_embedder",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+         helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"])],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", DIM])],
+        initializer=[numpy_helper.from_array(table, "table"),
+                     numpy_helper.from_array(np.array([-1], dtype=np.int64), "axes")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    onnx.save(model, os.path.join(HERE, "model.onnx"))
+
+
+if __name__ == "__main__":
+    build()
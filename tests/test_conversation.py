@@ -0,0 +1,37 @@
+"""
+Tests for the conversation history module.
+"""
+import pytest
+from src.conversation import ConversationHistory, estimate_tokens
+
+def test_history_is_capped():
+    """Test the history never holds more than max_messages."""
+    history = ConversationHistory(max_messages=4)
+    for i in range(10):
+        history.append("user", f"Question {i}")
+    
+    assert len(history) == 4
+    assert [m["content"] for m in history][0] == "Question 6"
+
+def test_window_respects_token_budget():
+    """Test the window keeps the newest messages within the budget."""
+    history = ConversationHistory()
+    history.append("user", "a" * 400)
+    history.append("assistant", "b" * 40)
+    history.append("user", "c" * 40)
+    
+    window = history.window(token_budget=2 * estimate_tokens("b" * 40))
+    
+    assert [m["content"][0] for m in window] == ["b", "c"]
+    assert history.window(token_budget=0) == []
+
+def test_rewrite_cache_invalidated_by_new_turns():
+    """Test cached rewrites only apply at the same point in the conversation."""
+    history = ConversationHistory()
+    history.append("user", "What is DSCR?")
+    history.store_rewrite("And how is it calculated?", "How is DSCR calculated?")
+    
+    assert history.cached_rewrite("and how is it calculated? ") == "How is DSCR calculated?"
+    
+    history.append("assistant", "Debt service coverage ratio.")
+    assert history.cached_rewrite("And how is it calculated?") is None
@@ -0,0 +1,51 @@
+from benchmarks.corpus import CRE_SENTENCES
+from src.dedup import Deduplicator, MinHasher, merge_source
+
+BOILERPLATE = ("Guarantor shall be liable for losses arising from fraud, intentional misrepresentation, "
+               "misappropriation of rents or insurance proceeds, waste, and environmental liabilities "
+               "incurred by Lender in connection with the Property and the Loan Documents.")
+
+
+def test_minhash_estimates_similarity():
+    """Test identical texts share a signature and unrelated texts rarely agree"""
+    hasher = MinHasher()
+    unrelated = "The appraiser reconciled the income and sales comparison approaches to value."
+
+    assert (hasher.signature(BOILERPLATE) == hasher.signature(BOILERPLATE)).all()
+    assert (hasher.signature(BOILERPLATE) == hasher.signature(unrelated)).mean() < 0.2
+
+
+def test_deduplicator_finds_near_duplicates_across_batches():
+    """Test near-duplicates map to the first copy, within and across batches"""
+    dedup = Deduplicator()
+    original = BOILERPLATE + " " + " ".join(CRE_SENTENCES)
+    reworded = original.replace("waste", "physical waste", 1)
+    reformatted = original.replace(", ", " , ").upper()
+
+    first = dedup.dedupe(["a", "b"], [original, "Rent is due monthly in advance."])
+    second = dedup.dedupe(["c", "d"], [reworded, reformatted])
+
+    assert first == {}
+    assert second == {0: "a", 1: "a"}
+    assert dedup.stats["duplicates"] == 2
+    assert dedup.stats["embedding_tokens_saved"] > 0
+
+
+def test_deduplicator_keeps_different_figures_apart():
+    """Test boilerplate that differs only in a figure is not merged"""
+    dedup = Deduplicator()
+    terms = "The Loan bears interest at {} percent per annum based on a thirty year amortization schedule."
+
+    assert dedup.dedupe(["a", "b"], [terms.format("5.75"), terms.format("6.10")]) == {}
+    dedup.remove(["a"])
+    assert dedup.dedupe(["c"], [terms.format("5.75")]) == {}
+
+
+def test_merge_source():
+    """Test sources accumulate in a scalar metadata field"""
+    merged = merge_source({"source": "a.pdf", "page": 3}, "b.pdf")
+    merged = merge_source(merged, "c.pdf")
+
+    assert merged["sources"] == "a.pdf|b.pdf|c.pdf"
+    assert merged["duplicates"] == 2
+    assert merged["page"] == 3
@@ -0,0 +1,47 @@
+from src.docstore import DocStore, expand_to_parents
+
+
+def test_docstore_add_get_delete():
+    """Test parents round-trip and deleted space is reclaimed"""
+    store = DocStore()
+    store.add(["a", "b"], ["Loan — section one", "Section two"], [{"page": 1}, {"page": 2}])
+
+    assert len(store) == 2
+    assert store.get("a") == "Loan — section one"
+    assert store.get_metadata("b") == {"page": 2}
+    assert store.get("missing") is None
+
+    store.delete(["a"])
+    assert "a" not in store
+    assert store.get("b") == "Section two"
+    assert store.memory_usage()["garbage_bytes"] == 0  # Compacted: more than half was dead
+
+    store.delete()
+    assert len(store) == 0
+
+
+def _results(rows):
+    return {
+        "ids": [[r[0] for r in rows]],
+        "distances": [[r[1] for r in rows]],
+        "documents": [[r[2] for r in rows]],
+        "metadatas": [[r[3] for r in rows]],
+    }
+
+
+def test_expand_to_parents_dedupes_and_budgets():
+    """Test children map to unique parents in rank order and fall back under the budget"""
+    store = DocStore()
+    store.add(["p1", "p2"], ["parent one " * 10, "parent two " * 100], [{"id": 1}, {"id": 2}])
+    results = _results([
+        ("c1", 0.1, "child a", {"parent_id": "p1"}),
+        ("c2", 0.2, "child b", {"parent_id": "p1"}),
+        ("c3", 0.3, "child c", {"parent_id": "p2"}),
+        ("c4", 0.4, "flat chunk", {}),
+    ])
+
+    hits = expand_to_parents(results, store, k=3, token_budget=60)
+
+    assert [text for _, text, _ in hits] == ["parent one " * 10, "child c", "flat chunk"]
+    assert [distance for distance, _, _ in hits] == [0.1, 0.3, 0.4]
+    assert hits[0][2] == {"id": 1}
@@ -0,0 +1,76 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from src.embeddings import MicroBatcher, OnnxEmbeddingProvider, get_embedding_provider
+
+TINY_MODEL = os.path.join(os.path.dirname(__file__), "data", "tiny_embedder")
+
+
+@pytest.fixture
+def local_embedder():
+    provider = OnnxEmbeddingProvider(TINY_MODEL, threads=1, max_batch_size=8, max_wait_ms=5)
+    yield provider
+    provider.close()
+
+
+def test_onnx_provider_embeddings(local_embedder):
+    """Test local embeddings are normalized and independent of batch padding"""
+    short = "Debt yield means net operating income divided by the loan amount."
+    long = "The Borrower shall maintain a Debt Service Coverage Ratio of not less than 1.25 to 1.00."
+
+    alone = local_embedder.embed([short])
+    together = local_embedder.embed([long, short])
+
+    assert together.shape == (2, 32)
+    assert together.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(together, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(alone[0], together[1], rtol=1e-5, atol=1e-6)
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    """Test concurrent requests share a batch and get their own vectors back"""
+    calls = []
+
+    def run_batch(texts):
+        calls.append(len(texts))
+        return np.array([[float(t)] for t in texts], dtype=np.float32)
+
+    batcher = MicroBatcher(run_batch, max_batch_size=64, max_wait_ms=50)
+    barrier = threading.Barrier(16)
+    results = {}
+
+    def request(i):
+        barrier.wait()
+        results[i] = batcher.submit([str(i), str(i + 100)]).result()
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert sum(calls) == 32
+    assert len(calls) < 16
+    for i, vectors in results.items():
+        assert vectors[:, 0].tolist() == [i, i + 100]
+
+
+def test_micro_batcher_propagates_errors():
+    """Test a failing batch fails every request in it"""
+    def run_batch(texts):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(run_batch, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.submit(["text"]).result()
+    batcher.close()
+
+
+def test_unknown_embedding_provider():
+    """Test an unknown provider name is rejected"""
+    with pytest.raises(ValueError):
+        get_embedding_provider("word2vec")
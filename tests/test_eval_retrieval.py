@@ -0,0 +1,44 @@
+from benchmarks.eval_retrieval import (
+    DEFAULT_DATASET, CachedEmbedder, evaluate, hash_embedder, is_hit, load_dataset, mark_pareto, score
+)
+
+
+def test_is_hit_and_score():
+    """Test gold span matching, recall@k and reciprocal rank"""
+    assert is_hit((0, 100), (20, 80))
+    assert is_hit((30, 60), (0, 200))
+    assert not is_hit((0, 30), (20, 200))
+
+    question = {"document": "loan", "spans": [(100, 200)]}
+    ranked = [("loan", 0, 50), ("appraisal", 100, 200), ("loan", 90, 210)]
+    assert score(ranked, question, k=2) == (0.0, 0.0)
+    assert score(ranked, question, k=3) == (1.0, 1 / 3)
+
+
+def test_mark_pareto():
+    """Test dominated configurations are excluded from the frontier"""
+    rows = [
+        {"recall_at_k": 0.9, "mrr": 0.8, "prompt_tokens": 900, "latency_ms_p50": 1.0},
+        {"recall_at_k": 0.7, "mrr": 0.6, "prompt_tokens": 300, "latency_ms_p50": 1.0},
+        {"recall_at_k": 0.7, "mrr": 0.6, "prompt_tokens": 600, "latency_ms_p50": 1.0},
+    ]
+    mark_pareto(rows)
+    assert [row["pareto"] for row in rows] == [True, True, False]
+
+
+def test_evaluate_bundled_dataset():
+    """Test a small sweep over the bundled labeled set runs offline"""
+    calls = []
+    embed = hash_embedder()
+    embedder = CachedEmbedder(lambda texts: calls.append(len(texts)) or embed(texts))
+
+    results = evaluate(load_dataset(DEFAULT_DATASET), embedder,
+                       chunk_sizes=[400], overlaps=[0, 100], ks=[1, 5], modes=["none"])
+
+    assert len(results) == 4
+    by_k = {(r["overlap"], r["k"]): r for r in results}
+    assert by_k[(0, 5)]["recall_at_k"] >= by_k[(0, 1)]["recall_at_k"] > 0
+    assert by_k[(0, 5)]["prompt_tokens"] > by_k[(0, 1)]["prompt_tokens"]
+    assert any(r["pareto"] for r in results)
+    # Questions are embedded once and reused across configurations
+    assert calls[0] == 28
@@ -0,0 +1,30 @@
+from benchmarks.fake_azure_openai import FakeServerConfig
+from benchmarks.load_test import LoadTestOptions, compare, run_load_test
+
+
+def test_load_test_report_and_retries():
+    """Test the harness reports latency percentiles and survives injected 429s"""
+    options = LoadTestOptions(
+        concurrency=4, queries=12, documents=2, pages_per_document=2,
+        server=FakeServerConfig(latency_ms=1, jitter_ms=0, tokens_per_second=2000,
+                                answer_tokens=5, rate_limit=0.2, retry_after=0.01),
+    )
+    report = run_load_test(options)
+
+    assert report["query"]["errors"] == 0
+    assert report["server"]["chat"] == 12
+    assert report["server"]["rate_limited"] > 0
+    assert set(report["query"]["latency_ms"]) >= {"p50", "p95", "p99"}
+    assert report["query"]["ttft_ms"]["p50"] <= report["query"]["latency_ms"]["p50"]
+    assert report["peak_rss_mb"] > 0
+
+
+def test_compare_flags_regressions():
+    """Test baseline comparison honours metric direction and tolerance"""
+    baseline = {"query": {"throughput_qps": 100.0, "latency_ms": {"p95": 50.0}}}
+    report = {"query": {"throughput_qps": 95.0, "latency_ms": {"p95": 70.0}}}
+
+    regressions = compare(report, baseline, tolerance=0.10)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("query.latency_ms.p95")
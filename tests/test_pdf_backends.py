@@ -0,0 +1,68 @@
+"""
+Tests for the PDF extraction backends module.
+"""
+import pytest
+from io import BytesIO
+from benchmarks.corpus import make_pdf
+from src.pdf_backends import (
+    PageExtractor,
+    PdfiumBackend,
+    PyPDF2Backend,
+    get_backends
+)
+
+PAGES = [["Cap rate is NOI divided by value."], ["DSCR is NOI divided by debt service."]]
+
+class BrokenBackend(PyPDF2Backend):
+    """Backend that fails on the first page."""
+    name = "broken"
+    
+    def extract_page(self, document, index):
+        if index == 0:
+            raise ValueError("Corrupt content stream")
+        return super().extract_page(document, index)
+
+class EmptyBackend(PyPDF2Backend):
+    """Backend that returns no text, like a scanned page."""
+    name = "empty"
+    
+    def extract_page(self, document, index):
+        return "   "
+
+def test_get_backends_ends_with_pypdf2():
+    """Test every chain can fall back to PyPDF2."""
+    for name in ("auto", "pypdf2", "pypdfium2"):
+        chain = get_backends(name)
+        assert chain[-1].name == "pypdf2"
+    
+    with pytest.raises(ValueError):
+        get_backends("unknown")
+
+def test_fallback_on_error():
+    """Test a page that fails on the primary backend is retried."""
+    extractor = PageExtractor(BytesIO(make_pdf(PAGES)), [BrokenBackend(), PyPDF2Backend()])
+    
+    assert "Cap rate" in extractor.extract(0)
+    assert "DSCR" in extractor.extract(1)
+    assert extractor.fallbacks == 1
+    extractor.close()
+
+def test_fallback_on_empty_text():
+    """Test empty primary output falls back to the next backend."""
+    extractor = PageExtractor(make_pdf(PAGES), [EmptyBackend(), PyPDF2Backend()])
+    
+    assert "Cap rate" in extractor.extract(0)
+    assert extractor.fallbacks == 1
+    extractor.close()
+
+@pytest.mark.skipif(not PdfiumBackend.available(), reason="pypdfium2 not installed")
+def test_pdfium_matches_pypdf2():
+    """Test the fast backend extracts the same words as PyPDF2."""
+    pdf_bytes = make_pdf(PAGES)
+    texts = {}
+    for backend in (PdfiumBackend(), PyPDF2Backend()):
+        extractor = PageExtractor(BytesIO(pdf_bytes), [backend])
+        texts[backend.name] = [extractor.extract(i).split() for i in range(extractor.num_pages)]
+        extractor.close()
+    
+    assert texts["pypdfium2"] == texts["pypdf2"]
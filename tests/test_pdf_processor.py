@@ -3,7 +3,9 @@ Tests for the PDF processor module.
 """
 import pytest
 from io import BytesIO
-from src.pdf_processor import PDFProcessor
+from unittest.mock import patch
+from benchmarks.corpus import make_cre_pdf
+from src.pdf_processor import PDFProcessor, page_ranges
 
 def test_clean_text():
     """Test text cleaning functionality."""
@@ -71,3 +73,59 @@ def test_chunk_overlap():
             
             # There should be some overlap between consecutive chunks
             assert any(word in next_chunk for word in current_chunk.split()[-3:])
+
+def test_parallel_extraction_matches_serial():
+    """Test parallel page extraction returns the same pages in order."""
+    pdf_bytes = make_cre_pdf(12, lines_per_page=5)
+    
+    serial = PDFProcessor.extract_pages(BytesIO(pdf_bytes), workers=1)
+    with patch('src.pdf_processor.PARALLEL_MIN_PAGES', 1):
+        parallel = PDFProcessor.extract_pages(BytesIO(pdf_bytes), workers=3)
+    
+    assert parallel == serial
+    assert [page_number for page_number, _ in parallel] == list(range(1, 13))
+
+def test_page_ranges():
+    """Test page ranges cover every page exactly once."""
+    ranges = page_ranges(10, 4)
+    
+    assert ranges[0][0] == 0 and ranges[-1][1] == 10
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+def test_process_pdf_page_metadata():
+    """Test chunks carry the pages their text came from."""
+    processor = PDFProcessor()
+    pdf_bytes = make_cre_pdf(3, lines_per_page=20)
+    
+    chunks = processor.process_pdf(BytesIO(pdf_bytes))
+    
+    assert chunks[0][1]["page"] == 1
+    assert chunks[-1][1]["page_end"] == 3
+    assert all(m["page"] <= m["page_end"] for _, m in chunks)
+
+def test_create_chunks_always_advances():
+    """Test chunking terminates when a break point falls inside the overlap."""
+    text = "A. " + "word " * 60 + ". B. " + "word " * 60
+    chunks = PDFProcessor.create_chunks(text, chunk_size=50, overlap=45)
+    
+    starts = [metadata["start_char"] for _, metadata in chunks]
+    assert starts == sorted(set(starts))
+    assert chunks[-1][1]["end_char"] >= len(text.rstrip())
+
+def test_create_hierarchical_chunks():
+    """Test sentence children tile their parents and link to them."""
+    sentences = [f"Clause {i} requires the Borrower to maintain the reserve described in schedule {i}."
+                 for i in range(30)]
+    text = " ".join(sentences)
+    chunks = PDFProcessor.create_hierarchical_chunks(text, parent_size=600)
+    
+    parents = {m["parent_index"]: (t, m) for t, m in chunks if m["chunk_type"] == "parent"}
+    children = [(t, m) for t, m in chunks if m["chunk_type"] == "prose"]
+    assert len(parents) > 1
+    for child, metadata in children:
+        parent_text, parent_meta = parents[metadata["parent_index"]]
+        assert child in parent_text
+        assert text[metadata["start_char"]:metadata["end_char"]] == child
+        assert parent_meta["start_char"] <= metadata["start_char"] < metadata["end_char"] <= parent_meta["end_char"]
+        assert len(child) <= 400
+    assert " ".join(t for t, _ in children) == text
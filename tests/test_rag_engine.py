@@ -1,14 +1,19 @@
 """
 Tests for the RAG engine module.
 """
+import base64
+
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch
+from src.conversation import ConversationHistory
 from src.rag_engine import RAGEngine
+from src.vector_store import VectorStore
 
 @pytest.fixture
 def mock_azure_client():
     """Create a mock Azure OpenAI client."""
-    with patch('openai.AzureOpenAI') as mock_client:
+    with patch('src.rag_engine.AzureOpenAI') as mock_client:
         yield mock_client
 
 @pytest.fixture
@@ -37,9 +42,21 @@ def test_create_embeddings(rag_engine, mock_azure_client):
     embeddings = rag_engine.create_embeddings(texts)
     
     # Verify
-    assert len(embeddings) == 2
-    assert all(isinstance(emb, list) for emb in embeddings)
-    assert len(embeddings[0]) == 3  # Embedding dimension
+    assert isinstance(embeddings, np.ndarray)
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (2, 3)  # (texts, embedding dimension)
+
+def test_create_embeddings_base64(rag_engine):
+    """Test base64-encoded embeddings are decoded without float lists."""
+    vector = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+    mock_response = Mock()
+    mock_response.data = [Mock(embedding=base64.b64encode(vector.tobytes()).decode())]
+    rag_engine.client.embeddings.create.return_value = mock_response
+    
+    embeddings = rag_engine.create_embeddings(["Text 1"])
+    
+    assert np.array_equal(embeddings[0], vector)
+    assert rag_engine.client.embeddings.create.call_args.kwargs["encoding_format"] == "base64"
 
 def test_initialize_vector_store(rag_engine):
     """Test vector store initialization."""
@@ -97,6 +114,130 @@ def test_query(rag_engine):
         assert "source_documents" in result
         assert result["answer"] == "Test answer"
 
+def test_query_rewrites_follow_ups(rag_engine):
+    """Test follow-ups are rewritten once per turn and history is sent to the model."""
+    history = ConversationHistory()
+    history.append("user", "What is DSCR?")
+    history.append("assistant", "Debt service coverage ratio.")
+    rag_engine.collection.query.return_value = {'documents': [["DSCR = NOI / debt service"]]}
+    
+    rewrite = Mock(choices=[Mock(message=Mock(content="How is DSCR calculated?"))])
+    answer = Mock(choices=[Mock(message=Mock(content="NOI divided by debt service"))])
+    rag_engine.client.chat.completions.create.side_effect = [rewrite, answer, answer]
+    
+    with patch.object(rag_engine, 'create_embeddings') as mock_create_embeddings:
+        mock_create_embeddings.return_value = [[0.1, 0.2]]
+        result = rag_engine.query("And how is it calculated?", history=history)
+        rag_engine.query("And how is it calculated?", history=history)
+        
+        mock_create_embeddings.assert_called_with(["How is DSCR calculated?"])
+    
+    assert result["search_query"] == "How is DSCR calculated?"
+    # One rewrite call plus two answer calls
+    assert rag_engine.client.chat.completions.create.call_count == 3
+    answer_messages = rag_engine.client.chat.completions.create.call_args.kwargs["messages"]
+    assert answer_messages[1] == {"role": "user", "content": "What is DSCR?"}
+
+def test_table_chunks_indexed_separately(mock_azure_client, mock_chroma_client):
+    """Test table chunks go to the table index and numeric questions search it."""
+    engine = RAGEngine("test-deployment", quantization="float16")
+    
+    with patch.object(engine, 'create_embeddings') as mock_create_embeddings:
+        mock_create_embeddings.return_value = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        engine.add_documents(
+            ["Rent is due monthly.", "Unit | Annual Rent\n101 | $36,000.00"],
+            [{"chunk_type": "prose"}, {"chunk_type": "table"}]
+        )
+        assert engine.collection.count() == 1
+        assert engine.table_collection.count() == 1
+        
+        mock_create_embeddings.return_value = np.array([[0.1, 0.9]], dtype=np.float32)
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="$36,000"))]
+        engine.client.chat.completions.create.return_value = mock_response
+        result = engine.query("What is the annual rent for unit 101?", k=1)
+    
+    assert result["source_documents"] == ["Unit | Annual Rent\n101 | $36,000.00"]
+    engine.collection.close()
+    engine.table_collection.close()
+
+def test_quantized_engine_uses_numpy_store(mock_azure_client, mock_chroma_client):
+    """Test a quantized engine stores and retrieves through the NumPy store."""
+    engine = RAGEngine("test-deployment", quantization="int8")
+    assert isinstance(engine.collection, VectorStore)
+    
+    with patch.object(engine, 'create_embeddings') as mock_create_embeddings:
+        mock_create_embeddings.return_value = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        engine.add_documents(["Cap rate", "Debt yield"], [{"source": "a"}, {"source": "b"}])
+        
+        mock_create_embeddings.return_value = np.array([[0.1, 0.9]], dtype=np.float32)
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="Test answer"))]
+        engine.client.chat.completions.create.return_value = mock_response
+        result = engine.query("What is debt yield?", k=1)
+    
+    assert result["source_documents"] == ["Debt yield"]
+    engine.collection.close()
+    engine.table_collection.close()
+
+def test_child_hits_expand_to_parents(mock_azure_client, mock_chroma_client):
+    """Test parent chunks skip embedding and child hits return deduplicated parents."""
+    engine = RAGEngine("test-deployment", quantization="float16")
+    parent = "Debt yield means NOI divided by the loan amount. It must stay above eight percent."
+    
+    with patch.object(engine, 'create_embeddings') as mock_create_embeddings:
+        mock_create_embeddings.return_value = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]], dtype=np.float32)
+        engine.add_documents(
+            [parent, "Debt yield means NOI divided by the loan amount.",
+             "It must stay above eight percent.", "Cap rates are concluded at 6.25 percent."],
+            [{"chunk_type": "parent", "parent_index": 0},
+             {"chunk_type": "prose", "parent_index": 0},
+             {"chunk_type": "prose", "parent_index": 0},
+             {"chunk_type": "prose"}]
+        )
+        # Only the three children are embedded; the parent lives in the docstore
+        assert mock_create_embeddings.call_args.args[0][0].startswith("Debt yield means NOI divided")
+        assert engine.collection.count() == 3
+        assert len(engine.docstore) == 1
+        
+        mock_create_embeddings.return_value = np.array([[1.0, 0.05]], dtype=np.float32)
+        mock_response = Mock()
+        mock_response.choices = [Mock(message=Mock(content="NOI / loan"))]
+        engine.client.chat.completions.create.return_value = mock_response
+        result = engine.query("What is debt yield?", k=2)
+    
+    assert result["source_documents"] == [parent, "Cap rates are concluded at 6.25 percent."]
+    engine.clear()
+    assert len(engine.docstore) == 0
+    engine.collection.close()
+    engine.table_collection.close()
+
+def test_duplicate_chunks_stored_once(mock_azure_client, mock_chroma_client):
+    """Test boilerplate repeated across documents is embedded once with both sources."""
+    engine = RAGEngine("test-deployment", quantization="float16")
+    boilerplate = ("Guarantor shall be liable for losses arising from fraud, misappropriation of rents "
+                   "or insurance proceeds, waste, and environmental liabilities of the Borrower.")
+    
+    with patch.object(engine, 'create_embeddings') as mock_create_embeddings:
+        mock_create_embeddings.return_value = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        engine.add_documents([boilerplate, "The cap rate is 6.25 percent."],
+                             [{"source": "a.pdf"}, {"source": "a.pdf"}])
+        
+        mock_create_embeddings.reset_mock()
+        mock_create_embeddings.return_value = np.array([[0.5, 0.5]], dtype=np.float32)
+        report = engine.add_documents([boilerplate, "The debt yield is 9 percent."],
+                                      [{"source": "b.pdf"}, {"source": "b.pdf"}])
+    
+    mock_create_embeddings.assert_called_once_with(["The debt yield is 9 percent."])
+    assert report["duplicates"] == 1
+    assert report["index_bytes_saved"] > len(boilerplate)
+    assert engine.collection.count() == 3
+    stored = engine.collection.get(where={"duplicates": 1})
+    assert stored["documents"] == [boilerplate]
+    assert stored["metadatas"][0]["sources"] == "a.pdf|b.pdf"
+    engine.collection.close()
+    engine.table_collection.close()
+
 def test_error_handling(rag_engine):
     """Test error handling in RAG engine."""
     # Test error in embeddings creation
@@ -0,0 +1,74 @@
+"""
+Tests for the table extractor module.
+"""
+import pytest
+from src.table_extractor import (
+    TableExtractor,
+    is_numeric_question,
+    is_table_row,
+    split_cells
+)
+
+RENT_ROLL_PAGE = "\n".join([
+    "Rent Roll",
+    "Unit    Tenant    SF    Annual Rent",
+    "101    Acme Dental    1,200    $36,000.00",
+    "102    Vacant    900    $0.00",
+    "103    Summit Legal LLP    2,500    $87,500.00",
+    "The rent roll is certified by the Borrower.",
+])
+
+def test_is_table_row():
+    """Test numeric rows are detected and prose sentences are not."""
+    assert is_table_row("101 Acme Dental 1,200 $36,000.00")
+    assert is_table_row("Net Operating Income $1,250,000")
+    assert not is_table_row("The interest rate is fixed at 5.75 percent with a 30-year amortization.")
+    assert not is_table_row("Section 12. Loan Agreement")
+
+def test_split_cells():
+    """Test cells split on column gaps or around numbers when gaps are lost."""
+    assert split_cells("101    Acme Dental    1,200") == ["101", "Acme Dental", "1,200"]
+    assert split_cells("101 Acme Dental 1,200 $36,000.00") == ["101", "Acme Dental", "1,200", "$36,000.00"]
+
+def test_split_page_separates_table_from_prose():
+    """Test table lines are removed from prose and emitted as a structured chunk."""
+    extractor = TableExtractor(chunk_rows=20)
+    prose, chunks = extractor.split_page(1, RENT_ROLL_PAGE)
+    
+    assert prose.strip() == "The rent roll is certified by the Borrower."
+    assert len(chunks) == 1
+    text, metadata = chunks[0]
+    assert text.splitlines()[:3] == [
+        "Table: Rent Roll",
+        "Unit | Tenant | SF | Annual Rent",
+        "101 | Acme Dental | 1,200 | $36,000.00",
+    ]
+    assert metadata["chunk_type"] == "table"
+    assert metadata["rows"] == 3
+
+def test_header_repeated_per_chunk():
+    """Test long tables are split into chunks that each repeat the header."""
+    extractor = TableExtractor(chunk_rows=2)
+    _, chunks = extractor.split_page(1, RENT_ROLL_PAGE)
+    
+    assert [m["rows"] for _, m in chunks] == [2, 1]
+    assert all("Unit | Tenant | SF | Annual Rent" in text for text, _ in chunks)
+    assert chunks[1][1]["row_start"] == 2
+
+def test_table_continues_across_pages():
+    """Test a table that runs onto the next page under the same header stays one table."""
+    table_only = "\n".join(RENT_ROLL_PAGE.splitlines()[:-1])
+    extractor = TableExtractor(chunk_rows=10)
+    
+    pages = list(extractor.iter_pages([(1, table_only), (2, table_only)]))
+    chunks = [chunk for _, _, page_chunks in pages for chunk in page_chunks]
+    
+    assert len(chunks) == 1
+    assert chunks[0][1]["rows"] == 6
+    assert (chunks[0][1]["page"], chunks[0][1]["page_end"]) == (1, 2)
+
+def test_is_numeric_question():
+    """Test figure questions are routed to tables."""
+    assert is_numeric_question("What is the annual rent for unit 101?")
+    assert is_numeric_question("How much NOI does the property generate?")
+    assert not is_numeric_question("What does the guarantor agree to?")
@@ -0,0 +1,75 @@
+"""
+Tests for the NumPy vector store module.
+"""
+import numpy as np
+import pytest
+from src.vector_store import VectorStore, quantize, dequantize, normalize
+
+@pytest.fixture
+def corpus():
+    """Create a small random corpus of normalized embeddings."""
+    rng = np.random.default_rng(0)
+    return normalize(rng.normal(size=(200, 64)))
+
+@pytest.fixture(params=["none", "float16", "int8"])
+def store(request, corpus):
+    """Create a populated store for each quantization mode."""
+    store = VectorStore(quantization=request.param)
+    ids = [f"doc_{i}" for i in range(len(corpus))]
+    store.add(ids=ids, embeddings=corpus, documents=ids,
+              metadatas=[{"source": "even" if i % 2 == 0 else "odd"} for i in range(len(corpus))])
+    yield store
+    store.close()
+
+def test_int8_roundtrip(corpus):
+    """Test int8 codes reconstruct vectors within quantization error."""
+    codes, scales = quantize(corpus, "int8")
+
+    assert codes.dtype == np.int8
+    assert scales.shape == (len(corpus),)
+    assert np.abs(dequantize(codes, scales) - corpus).max() < scales.max()
+
+def test_query_returns_exact_neighbours(store, corpus):
+    """Test rescoring recovers the exact nearest neighbour."""
+    results = store.query(query_embeddings=corpus[:5], n_results=3)
+
+    assert len(results["ids"]) == 5
+    for i, ids in enumerate(results["ids"]):
+        assert ids[0] == f"doc_{i}"
+        assert len(ids) == 3
+    assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+
+def test_query_where_filter(store, corpus):
+    """Test metadata filters restrict the candidates."""
+    results = store.query(query_embeddings=corpus[:1], n_results=5, where={"source": "odd"})
+
+    assert all(m["source"] == "odd" for m in results["metadatas"][0])
+
+def test_memory_usage(corpus):
+    """Test quantized stores hold fewer bytes per vector in RAM."""
+    sizes = {}
+    for mode in ("none", "float16", "int8"):
+        store = VectorStore(quantization=mode)
+        store.add(ids=[str(i) for i in range(len(corpus))], embeddings=corpus)
+        sizes[mode] = store.memory_usage()["bytes_per_vector"]
+        store.close()
+
+    assert sizes["none"] == 64 * 4
+    assert sizes["float16"] == 64 * 2
+    assert sizes["int8"] == 64 + 4  # codes + per-vector scale
+
+def test_delete(store, corpus):
+    """Test deleting by id and clearing the store."""
+    store.delete(ids=["doc_0"])
+
+    assert store.count() == len(corpus) - 1
+    assert store.query(query_embeddings=corpus[:1], n_results=1)["ids"][0][0] != "doc_0"
+
+    store.delete()
+    assert store.count() == 0
+    assert store.query(query_embeddings=corpus[:1], n_results=1)["ids"] == [[]]
+
+def test_duplicate_ids(store, corpus):
+    """Test adding an existing id is rejected."""
+    with pytest.raises(ValueError):
+        store.add(ids=["doc_0"], embeddings=corpus[:1])